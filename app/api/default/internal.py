@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_api_key
+from app.core import g
+from app.core._log import log_queue_stats
+from app.core.access_log import access_logger
+from app.core.loop_monitor import loop_monitor
+from app.utils.password_util import password_hasher
+
+# 内部接口（需X-API-Key，不出现在文档中）
+router = APIRouter(include_in_schema=False, dependencies=[Depends(get_current_api_key)])
+
+
+@router.get(
+    path="/internal/stats",
+    summary="internal stats",
+)
+async def internal_stats():
+    data = {
+        "password_hasher": password_hasher.stats(),
+        "access_log": access_logger.stats(),
+        "loop_monitor": loop_monitor.stats(),
+    }
+    if log_queue := log_queue_stats():
+        data["log_queue"] = log_queue
+    if db_async_session_ro := getattr(g, "db_async_session_ro", None):
+        data["db_pool"] = db_async_session_ro.pool_stats()
+    if aredis := getattr(g, "aredis", None):
+        data["redis_pool"] = aredis.pool_stats()
+    return data
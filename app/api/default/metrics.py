@@ -0,0 +1,21 @@
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core import g
+from app.core.metrics import app_metrics
+
+_active = g.config.APP_METRICS  # 激活状态（APP_METRICS）
+
+# 指标接口（供prometheus抓取，不出现在文档中；对外暴露时请在网关层限制访问）
+router = APIRouter(include_in_schema=False)
+
+
+@router.get(
+    path="/metrics",
+    summary="metrics",
+)
+async def metrics():
+    data, content_type = await asyncio.to_thread(app_metrics.render)  # 多进程时需读取各进程文件
+    return Response(content=data, media_type=content_type)
@@ -1,15 +1,32 @@
+from collections.abc import AsyncIterator
+
 from fastapi import Depends, Security
 from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.security.utils import get_authorization_scheme_param
+from jwt import InvalidSignatureError
 from pydantic import BaseModel
 from sqlalchemy import text
 from sqlalchemy.sql.elements import quoted_name
 from starlette.requests import Request
 
 from app.core import g
+from app.core._db import UnitOfWork, db_session, unit_of_work
 from app.core.exceptions import CustomException
 from app.core.status import Status
-from app.utils.jwt_util import verify_jwt
+from app.utils.cache_util import jwt_key_cache
+from app.utils.jwt_util import parse_jwt, verify_parsed_jwt
+
+# -------------------- db --------------------
+
+
+async def get_db_uow() -> AsyncIterator[UnitOfWork]:
+    """
+    请求级工作单元：同一请求内（含认证依赖、业务逻辑）复用同一会话，成功提交、异常回滚
+    用法：APIRouter(dependencies=[Depends(get_db_uow, scope="function")])（function：响应前提交）
+    """
+    async with unit_of_work(g.db_async_session) as uow:
+        yield uow
+
 
 # -------------------- jwt --------------------
 
@@ -26,13 +43,18 @@ class JWTUser(BaseModel):
     avatar: str | None = None
 
     @staticmethod
-    async def get_user_jwt_key(user_id: str) -> str | None:
+    async def get_user_jwt_key(user_id: str, use_cache: bool = True) -> str | None:
         if g.config.JWT_KEY:  # 直接从环境中获取（适用于不存数据库的场景）
             return g.config.JWT_KEY
-        # 建议：jwt_key进行redis缓存
+        # jwt_key缓存：进程内 -> redis -> 数据库
+        return await jwt_key_cache.get(str(user_id), loader=JWTUser._load_user_jwt_key, use_cache=use_cache)
+
+    @staticmethod
+    async def _load_user_jwt_key(user_id: str) -> str | None:
+        # 读主库：从库延迟时可能读到登出/轮换前的jwt_key并回填缓存
         table = quoted_name("users", quote=True)
         sql = f"SELECT jwt_key FROM {table} WHERE id = :id"
-        async with g.db_async_session() as session:
+        async with db_session(g.db_async_session) as session:
             result = await session.execute(text(sql), params={"id": int(user_id)})
             row = result.fetchone()
             return row[0] if row else None
@@ -44,18 +66,25 @@ class JWTAuthorizationCredentials(HTTPAuthorizationCredentials):
 
 async def verify_jwt_token(token: str, typ: str) -> JWTUser:
     try:
-        # 获取
-        payload = verify_jwt(token=token)
-        if payload is None:
-            raise CustomException(status=Status.UNAUTHORIZED_ERROR)
-        user_jwt_key = await JWTUser.get_user_jwt_key(payload.get("id"))
+        # 解析（仅一次）
+        parsed = parse_jwt(token)
+        user_id = parsed.payload.get("id")
+        user_jwt_key = await JWTUser.get_user_jwt_key(user_id)
         if not user_jwt_key:
             raise CustomException(status=Status.UNAUTHORIZED_ERROR)
         # 验证
-        verify_jwt(token=token, key=user_jwt_key, typ=typ)
+        try:
+            verify_parsed_jwt(parsed, key=user_jwt_key, typ=typ)
+        except InvalidSignatureError:
+            # 缓存可能滞后于其他进程的jwt_key轮换，跳过缓存重试一次（同一用户reload_interval秒内最多读库一次，
+            # 已登出的token不会每次请求都读库）
+            user_jwt_key = await JWTUser.get_user_jwt_key(user_id, use_cache=False)
+            if not user_jwt_key:
+                raise
+            verify_parsed_jwt(parsed, key=user_jwt_key, typ=typ)
     except Exception as e:
         raise CustomException(status=Status.UNAUTHORIZED_ERROR, error=e) from e
-    return JWTUser(**payload)
+    return JWTUser(**parsed.payload)
 
 
 class JWTBearer(HTTPBearer):
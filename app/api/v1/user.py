@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, Query
 
-from app.api.deps import JWTUser, get_current_user, get_current_user_from_refresh
+from app.api.deps import JWTUser, get_current_user, get_current_user_from_refresh, get_db_uow
 from app.core import g
 from app.core.responses import Responses, response_docs
 from app.core.status import Status
@@ -21,8 +21,9 @@ _active = True  # 激活状态（默认激活）
 _tag = "user"  # 标签（默认模块名，但传入tags优先）
 # router格式：router|xxx_router
 # # 精确路由放前面
-auth_router = APIRouter(tags=["user-auth"])
-router = APIRouter(tags=["user"])
+# # 请求级工作单元：认证依赖与业务逻辑共用同一会话
+auth_router = APIRouter(tags=["user-auth"], dependencies=[Depends(get_db_uow, scope="function")])
+router = APIRouter(tags=["user"], dependencies=[Depends(get_db_uow, scope="function")])
 
 
 @router.get(
@@ -47,6 +48,8 @@ router = APIRouter(tags=["user"])
                 }
             ],
             "total": "int",
+            "next_cursor": "str",
+            "has_more": "bool",
         }
     ),
 )
@@ -57,7 +60,7 @@ async def list_user(
 ):
     if current_user.role != "admin":
         return Responses.failure(status=Status.USER_PERMISSION_ERROR)
-    data = await user_svc.list_user(req)
+    data = await user_svc.list_user(req, count_mode="cached")  # 总数策略：exact|cached|estimated|skip
     return Responses.success(data=data)
 
 
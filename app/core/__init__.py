@@ -6,15 +6,14 @@ import logging
 from functools import cached_property
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from toollib.guid import SnowFlake
 from toollib.rediscli import RedisCli
 from toollib.utils import Singleton
 
 from app.core._conf import Config, init_config
-from app.core._db import init_db_async_session
+from app.core._db import ReadSessionRouter, init_db_async_session, init_db_async_session_ro
 from app.core._log import init_logger
-from app.core._redis import init_redis_cli
-from app.core._snow import init_snow_cli
+from app.core._redis import AsyncRedisCli, init_aredis, init_redis_cli
+from app.core._snow import SnowFlakeGenerator, init_snow_cli
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +27,10 @@ class G(metaclass=Singleton):
         "config",
         "logger",
         "redis_cli",
+        "aredis",
         "snow_cli",
         "db_async_session",
+        "db_async_session_ro",
     )
 
     def __init__(self):
@@ -45,6 +46,10 @@ class G(metaclass=Singleton):
             level="DEBUG" if self.config.APP_DEBUG else "INFO",
             serialize=self.config.APP_LOG_SERIALIZE,
             outdir=self.config.APP_LOG_OUTDIR,
+            queue_enabled=self.config.APP_LOG_QUEUE,
+            queue_maxsize=self.config.APP_LOG_QUEUE_MAXSIZE,
+            queue_policy=self.config.APP_LOG_QUEUE_POLICY,
+            queue_sample_rate=self.config.APP_LOG_QUEUE_SAMPLE_RATE,
         )
 
     @cached_property
@@ -58,10 +63,22 @@ class G(metaclass=Singleton):
         )
 
     @cached_property
-    def snow_cli(self) -> SnowFlake:
+    def aredis(self) -> AsyncRedisCli:
+        return init_aredis(
+            host=self.config.REDIS_HOST,
+            port=self.config.REDIS_PORT,
+            db=self.config.REDIS_DB,
+            password=self.config.REDIS_PASSWORD,
+            max_connections=self.config.REDIS_MAX_CONNECTIONS,
+            pool_timeout=self.config.REDIS_POOL_TIMEOUT,
+        )
+
+    @cached_property
+    def snow_cli(self) -> SnowFlakeGenerator:
         return init_snow_cli(
             redis_cli=getattr(self, "redis_cli", None),
             datacenter_id=self.config.SNOW_DATACENTER_ID,
+            lease_ttl=self.config.SNOW_LEASE_TTL,
         )
 
     @cached_property
@@ -75,9 +92,38 @@ class G(metaclass=Singleton):
             db_port=self.config.DB_PORT,
             db_charset=self.config.DB_CHARSET,
             db_echo=self.config.APP_DEBUG,
+            db_pool_size=self.config.DB_POOL_SIZE,
+            db_max_overflow=self.config.DB_MAX_OVERFLOW,
+            db_pool_recycle=self.config.DB_POOL_RECYCLE,
+            db_pool_timeout=self.config.DB_POOL_TIMEOUT,
+            db_pool_budget=self.config.DB_POOL_BUDGET,
+            db_pool_ping=self.config.DB_POOL_PING,
+            db_pool_ping_idle=self.config.DB_POOL_PING_IDLE,
+            db_sqlite_tuned=self.config.DB_SQLITE_TUNED,
+            db_sqlite_readers=self.config.DB_SQLITE_READERS,
+            db_sqlite_mmap_size=self.config.DB_SQLITE_MMAP_SIZE,
+            db_sqlite_busy_timeout=self.config.DB_SQLITE_BUSY_TIMEOUT,
+            db_slow_query_ms=self.config.DB_SLOW_QUERY_MS,
             db_drivername=self.config.DB_DRIVERNAME,
         )
 
+    @cached_property
+    def db_async_session_ro(self) -> ReadSessionRouter:
+        return init_db_async_session_ro(
+            db_async_session=self.db_async_session,
+            db_replica_hosts=self.config.DB_REPLICA_HOSTS,
+            db_replica_strategy=self.config.DB_REPLICA_STRATEGY,
+            db_echo=self.config.APP_DEBUG,
+            db_pool_size=self.config.DB_POOL_SIZE,
+            db_max_overflow=self.config.DB_MAX_OVERFLOW,
+            db_pool_recycle=self.config.DB_POOL_RECYCLE,
+            db_pool_timeout=self.config.DB_POOL_TIMEOUT,
+            db_pool_budget=self.config.DB_POOL_BUDGET,
+            db_pool_ping=self.config.DB_POOL_PING,
+            db_pool_ping_idle=self.config.DB_POOL_PING_IDLE,
+            db_slow_query_ms=self.config.DB_SLOW_QUERY_MS,
+        )
+
     def setup(self, force: bool = False, required_properties: tuple | None = None):
         if force or not self._initialized:
             props = required_properties or self._required_properties or ()
@@ -23,6 +23,7 @@ class Config(ConfModel):
     API_KEYS: list = []
     JWT_KEY: str = ""
     SNOW_DATACENTER_ID: int = None
+    SNOW_LEASE_TTL: int = 60
     # #
     APP_TITLE: str = "xApp"
     APP_SUMMARY: str = "xxApp"
@@ -31,12 +32,29 @@ class Config(ConfModel):
     APP_DEBUG: bool = True
     APP_LOG_SERIALIZE: bool = False
     APP_LOG_OUTDIR: str = "./logs"
+    APP_LOG_QUEUE: bool = False
+    APP_LOG_QUEUE_MAXSIZE: int = 10000
+    APP_LOG_QUEUE_POLICY: str = "drop"
+    APP_LOG_QUEUE_SAMPLE_RATE: float = 0.1
+    APP_ERROR_LOG_WINDOW: float = 60
+    APP_ERROR_LOG_BURST: int = 5
+    APP_ERROR_LOG_SAMPLE_RATE: float = 0.01
+    APP_ACCESS_LOG: bool = True
+    APP_ACCESS_LOG_FILE: str = ""
+    APP_ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    APP_METRICS: bool = True
+    APP_LOOP_MONITOR: bool = True
+    APP_LOOP_STALL_THRESHOLD: float = 0.1
     APP_DISABLE_DOCS: bool = False
     APP_ALLOW_CREDENTIALS: bool = True
     APP_ALLOW_ORIGINS: list = ["*"]
     APP_ALLOW_METHODS: list = ["*"]
     APP_ALLOW_HEADERS: list = ["*"]
     # #
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_MAX_WORKERS: int = None
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5
+    # #
     DB_DRIVERNAME: str
     DB_ASYNC_DRIVERNAME: str
     DB_DATABASE: str
@@ -45,11 +63,28 @@ class Config(ConfModel):
     DB_HOST: str = None
     DB_PORT: int = None
     DB_CHARSET: str = None
+    DB_REPLICA_HOSTS: list = []
+    DB_REPLICA_STRATEGY: str = "round_robin"
+    DB_POOL_SIZE: int = None
+    DB_MAX_OVERFLOW: int = None
+    DB_POOL_RECYCLE: int = 3600
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_BUDGET: int = None
+    DB_POOL_PING: str = "idle"
+    DB_POOL_PING_IDLE: float = 30
+    DB_SQLITE_TUNED: bool = False
+    DB_SQLITE_READERS: int = 4
+    DB_SQLITE_MMAP_SIZE: int = 268435456
+    DB_SQLITE_BUSY_TIMEOUT: int = 5000
+    DB_SLOW_QUERY_MS: float = 200
+    DB_WRITE_BEHIND_INTERVAL: float = 5
+    DB_WRITE_BEHIND_MAX_PENDING: int = 1000
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_DB: int
     REDIS_PASSWORD: str = None
     REDIS_MAX_CONNECTIONS: int = None
+    REDIS_POOL_TIMEOUT: float = 5
 
 
 def init_config() -> Config:
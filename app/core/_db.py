@@ -1,15 +1,309 @@
 import importlib
+import itertools
+import logging
+import multiprocessing
+import os
 import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 
-from sqlalchemy import URL, create_engine
+from sqlalchemy import URL, Select, TextClause, create_engine, event
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.orm.decl_api import DeclarativeAttributeIntercept
 
 from app import APP_DIR
+from app.core.context import db_stats_var
 
 _MODELS_MOD_DIR = APP_DIR.joinpath("models")
 _MODELS_MOD_BASE = "app.models"
 _DECL_BASE_NAME = "DeclBase"
+_use_primary_var: ContextVar[bool] = ContextVar("db_use_primary", default=False)
+_uow_var: ContextVar["UnitOfWork | None"] = ContextVar("db_uow", default=None)
+
+logger = logging.getLogger(__name__)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """连接池（统计获取连接的等待耗时与超时次数）"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except sa_exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        wait = time.perf_counter() - start
+        self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        return conn
+
+
+class ReconnectAsyncSession(AsyncSession):
+    """
+    会话（连接断开时重试一次，仅限事务内首条语句，避免重复写入）
+    注：scalars/stream_scalars分别经由execute/stream，同样重试
+    """
+
+    async def execute(self, *args, **kwargs):
+        return await self._retry_once(super().execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._retry_once(super().scalar, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._retry_once(super().get, *args, **kwargs)
+
+    async def get_one(self, *args, **kwargs):
+        return await self._retry_once(super().get_one, *args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        # 仅重试获取结果前的断开（迭代过程中断开不重试）
+        return await self._retry_once(super().stream, *args, **kwargs)
+
+    async def _retry_once(self, method, *args, **kwargs):
+        fresh = not self.in_transaction()
+        try:
+            return await method(*args, **kwargs)
+        except sa_exc.DBAPIError as e:
+            if not (fresh and e.connection_invalidated):
+                raise
+            logger.warning(f"db connection invalidated, retry once: {e.orig!r}")
+            await self.rollback()
+            return await method(*args, **kwargs)
+
+
+class PrimaryAsyncSession(ReconnectAsyncSession):
+    """主库会话（提交后，当前请求后续的只读会话回落主库，保证读己之写）"""
+
+    async def commit(self) -> None:
+        await super().commit()
+        _use_primary_var.set(True)
+
+
+class ReadSessionRouter:
+    """
+    只读会话路由：从库间round_robin|least_conn选择
+    注：未配置从库、或当前请求已写入（或调用了use_primary）时回落主库
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replicas: list[async_sessionmaker[AsyncSession]],
+        strategy: str = "round_robin",
+    ):
+        if strategy not in ("round_robin", "least_conn"):
+            raise ValueError(f"Invalid replica strategy: {strategy}")
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self._rr = itertools.count()
+
+    def __call__(self, **kwargs) -> AsyncSession:
+        if not self.use_replica():
+            return self.primary(**kwargs)
+        return self._choose()(**kwargs)
+
+    def use_replica(self) -> bool:
+        """当前上下文是否走从库"""
+        return bool(self.replicas) and not _use_primary_var.get()
+
+    def _choose(self) -> async_sessionmaker[AsyncSession]:
+        i = next(self._rr) % len(self.replicas)
+        if self.strategy == "least_conn":
+            # 从轮询位置开始取最小，连接数相同时仍能分散
+            return min(self.replicas[i:] + self.replicas[:i], key=self._checkedout)
+        return self.replicas[i]
+
+    @staticmethod
+    def _checkedout(replica: async_sessionmaker[AsyncSession]) -> int:
+        pool = replica.kw["bind"].pool
+        return pool.checkedout() if hasattr(pool, "checkedout") else 0
+
+    def pool_stats(self) -> list[dict]:
+        """连接池统计（主库+从库）"""
+        return [
+            _pool_stats(name, sm.kw["bind"].pool)
+            for name, sm in [("primary", self.primary)]
+            + [(f"replica:{r.kw['bind'].url.host or r.kw['bind'].url.database}", r) for r in self.replicas]
+        ]
+
+
+def _pool_stats(name: str, pool) -> dict:
+    stats = {"name": name, "pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, TimedQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            wait_avg_ms=round(pool.wait_total / (pool.checkouts or 1) * 1000, 3),
+            wait_max_ms=round(pool.wait_max * 1000, 3),
+        )
+    return stats
+
+
+class SqliteRoutingSession(Session):
+    """
+    sqlite读写分离会话：只读查询走读连接池，写入（及写入后的查询）走单写连接
+    注：读连接池通过sessionmaker的info["db_reader"]传入
+    """
+
+    _wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        reader = self.info.get("db_reader")
+        if reader is not None and not self._wrote and not self._flushing and self._is_read(clause):
+            return reader.sync_engine
+        self._wrote = True
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def commit(self):
+        super().commit()
+        self._wrote = False
+
+    def rollback(self):
+        super().rollback()
+        self._wrote = False
+
+    @staticmethod
+    def _is_read(clause) -> bool:
+        if isinstance(clause, Select):
+            return True
+        if isinstance(clause, TextClause):
+            return clause.text.lstrip()[:6].upper() == "SELECT"
+        return False
+
+
+def use_primary(flag: bool = True):
+    """只读会话强制走主库（作用于当前请求上下文）"""
+    _use_primary_var.set(flag)
+
+
+@contextmanager
+def primary_reads():
+    """作用域内只读会话走主库（退出后恢复，如结果缓存的回填）"""
+    token = _use_primary_var.set(True)
+    try:
+        yield
+    finally:
+        _use_primary_var.reset(token)
+
+
+class UnitOfWork:
+    """
+    工作单元（请求级会话）：同一请求内的数据库操作复用同一会话，结束时成功提交、异常回滚
+    - 业务内通过commit_session提交：工作单元内仅flush，由工作单元统一提交（提交后执行after_commit回调，如缓存失效）
+    注：会话惰性创建，未访问数据库的请求不占用连接
+    """
+
+    def __init__(self, db_async_session: async_sessionmaker[AsyncSession]):
+        self.db_async_session = db_async_session
+        self.after_commit: list[Callable[[], Awaitable]] = []
+        self._session: AsyncSession | None = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self.db_async_session()
+        return self._session
+
+    def owns(self, session: AsyncSession) -> bool:
+        """是否为本工作单元的会话"""
+        return session is self._session
+
+    async def close(self, exc: BaseException | None = None):
+        session, self._session = self._session, None
+        callbacks, self.after_commit = self.after_commit, []
+        if session is None:
+            return
+        try:
+            if exc is not None:
+                await session.rollback()
+                return
+            if session.in_transaction():
+                await session.commit()
+        finally:
+            await session.close()
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.warning(f"uow after_commit callback failed: {e!r}")
+
+
+@asynccontextmanager
+async def unit_of_work(db_async_session: async_sessionmaker[AsyncSession]) -> AsyncIterator[UnitOfWork]:
+    """开启工作单元（作用于当前上下文）"""
+    uow = UnitOfWork(db_async_session)
+    token = _uow_var.set(uow)
+    try:
+        yield uow
+    except BaseException as e:
+        await uow.close(e)
+        raise
+    else:
+        await uow.close()
+    finally:
+        _uow_var.reset(token)
+
+
+@asynccontextmanager
+async def db_session(
+    db_async_session: async_sessionmaker[AsyncSession] | ReadSessionRouter,
+) -> AsyncIterator[AsyncSession]:
+    """
+    获取会话：工作单元内复用其会话（由工作单元负责提交/回滚/关闭），否则新建独立会话
+    注：传入只读会话路由且当前走从库时，仍使用从库的独立会话
+    """
+    uow = _uow_var.get()
+    if uow is not None:
+        if isinstance(db_async_session, ReadSessionRouter):
+            shared = db_async_session.primary is uow.db_async_session and not db_async_session.use_replica()
+        else:
+            shared = db_async_session is uow.db_async_session
+        if shared:
+            yield uow.session
+            return
+    async with db_async_session() as session:
+        yield session
+
+
+async def commit_session(session: AsyncSession, *after_commit: Callable[[], Awaitable]):
+    """
+    提交：工作单元内仅flush（由工作单元在请求结束时提交），否则直接提交
+    :param session: 会话（db_session所得）
+    :param after_commit: 提交成功后执行的回调（如缓存失效；工作单元内推迟到工作单元提交后）
+    """
+    uow = _uow_var.get()
+    if uow is not None and uow.owns(session):
+        await session.flush()
+        _use_primary_var.set(True)  # 已写入（未提交）：后续只读会话复用工作单元会话
+        uow.after_commit.extend(after_commit)
+        return
+    await session.commit()
+    for callback in after_commit:
+        await callback()
 
 
 def init_db_async_session(
@@ -21,9 +315,18 @@ def init_db_async_session(
     db_port: int,
     db_charset: str | None = None,
     db_echo: bool | None = None,
-    db_pool_size: int = 10,
-    db_max_overflow: int = 5,
+    db_pool_size: int | None = None,
+    db_max_overflow: int | None = None,
     db_pool_recycle: int = 3600,
+    db_pool_timeout: float = 30,
+    db_pool_budget: int | None = None,
+    db_pool_ping: str = "idle",
+    db_pool_ping_idle: float = 30,
+    db_sqlite_tuned: bool = False,
+    db_sqlite_readers: int = 4,
+    db_sqlite_mmap_size: int = 268435456,
+    db_sqlite_busy_timeout: int = 5000,
+    db_slow_query_ms: float = 200,
     db_drivername: str | None = None,
 ) -> async_sessionmaker[AsyncSession]:
     db_url = make_db_url(
@@ -36,20 +339,33 @@ def init_db_async_session(
         query={"charset": db_charset},
     )
     db_echo = db_echo or False
-    kwargs = {
-        "pool_size": db_pool_size,
-        "max_overflow": db_max_overflow,
-        "pool_recycle": db_pool_recycle,
-    }
-    if db_url.drivername.startswith("sqlite"):
-        kwargs = {}
-    async_engine = create_async_engine(
-        url=db_url,
-        echo=db_echo,
-        pool_pre_ping=True,
-        **kwargs,
-    )
-    db_async_session = async_sessionmaker[AsyncSession](async_engine, expire_on_commit=False)
+    if db_sqlite_tuned and db_url.drivername.startswith("sqlite") and db_url.database not in (None, "", ":memory:"):
+        db_async_session = _init_sqlite_tuned(
+            db_url=db_url,
+            db_echo=db_echo,
+            db_pool_timeout=db_pool_timeout,
+            db_sqlite_readers=db_sqlite_readers,
+            db_sqlite_mmap_size=db_sqlite_mmap_size,
+            db_sqlite_busy_timeout=db_sqlite_busy_timeout,
+        )
+    else:
+        db_pool_size, db_max_overflow = resolve_pool_size(db_pool_size, db_max_overflow, db_pool_budget)
+        async_engine = _create_async_engine(
+            db_url=db_url,
+            db_echo=db_echo,
+            db_pool_size=db_pool_size,
+            db_max_overflow=db_max_overflow,
+            db_pool_recycle=db_pool_recycle,
+            db_pool_timeout=db_pool_timeout,
+            db_pool_ping=db_pool_ping,
+            db_pool_ping_idle=db_pool_ping_idle,
+        )
+        db_async_session = async_sessionmaker[AsyncSession](
+            async_engine, class_=PrimaryAsyncSession, expire_on_commit=False
+        )
+    _listen_query_stats(db_async_session.kw["bind"].sync_engine, slow_ms=db_slow_query_ms)
+    if reader := db_async_session.kw.get("info", {}).get("db_reader"):
+        _listen_query_stats(reader.sync_engine, slow_ms=db_slow_query_ms)
     if db_drivername:
         create_tables(
             db_drivername=db_drivername,
@@ -64,6 +380,210 @@ def init_db_async_session(
     return db_async_session
 
 
+def init_db_async_session_ro(
+    db_async_session: async_sessionmaker[AsyncSession],
+    db_replica_hosts: list | None = None,
+    db_replica_strategy: str = "round_robin",
+    db_echo: bool | None = None,
+    db_pool_size: int | None = None,
+    db_max_overflow: int | None = None,
+    db_pool_recycle: int = 3600,
+    db_pool_timeout: float = 30,
+    db_pool_budget: int | None = None,
+    db_pool_ping: str = "idle",
+    db_pool_ping_idle: float = 30,
+    db_slow_query_ms: float = 200,
+) -> ReadSessionRouter:
+    """
+    只读会话（从库与主库同库名、同账号，db_replica_hosts格式：host或host:port）
+    """
+    primary_url = db_async_session.kw["bind"].url
+    replicas = []
+    if reader := db_async_session.kw.get("info", {}).get("db_reader"):
+        # sqlite调优模式：读连接池充当从库
+        replicas.append(
+            async_sessionmaker[AsyncSession](reader, class_=ReconnectAsyncSession, expire_on_commit=False)
+        )
+        db_replica_hosts = []
+    if db_replica_hosts and primary_url.drivername.startswith("sqlite"):
+        logger.warning("sqlite does not support replicas, DB_REPLICA_HOSTS ignored")
+        db_replica_hosts = []
+    db_pool_size, db_max_overflow = resolve_pool_size(db_pool_size, db_max_overflow, db_pool_budget)
+    for replica_host in db_replica_hosts or []:
+        host, _, port = str(replica_host).partition(":")
+        async_engine = _create_async_engine(
+            db_url=primary_url.set(host=host, port=int(port) if port else primary_url.port),
+            db_echo=db_echo or False,
+            db_pool_size=db_pool_size,
+            db_max_overflow=db_max_overflow,
+            db_pool_recycle=db_pool_recycle,
+            db_pool_timeout=db_pool_timeout,
+            db_pool_ping=db_pool_ping,
+            db_pool_ping_idle=db_pool_ping_idle,
+        )
+        _listen_query_stats(async_engine.sync_engine, slow_ms=db_slow_query_ms)
+        replicas.append(
+            async_sessionmaker[AsyncSession](async_engine, class_=ReconnectAsyncSession, expire_on_commit=False)
+        )
+    return ReadSessionRouter(primary=db_async_session, replicas=replicas, strategy=db_replica_strategy)
+
+
+def _init_sqlite_tuned(
+    db_url: URL,
+    db_echo: bool,
+    db_pool_timeout: float,
+    db_sqlite_readers: int,
+    db_sqlite_mmap_size: int,
+    db_sqlite_busy_timeout: int,
+) -> async_sessionmaker[AsyncSession]:
+    """
+    sqlite调优模式：WAL + pragmas，单写连接 + 读连接池（读连接为query_only）
+    """
+    pool_kwargs = {"poolclass": TimedQueuePool, "max_overflow": 0, "pool_timeout": db_pool_timeout}
+    writer = create_async_engine(url=db_url, echo=db_echo, pool_size=1, **pool_kwargs)
+    reader = create_async_engine(url=db_url, echo=db_echo, pool_size=max(db_sqlite_readers, 1), **pool_kwargs)
+    pragmas = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": db_sqlite_mmap_size,
+        "busy_timeout": db_sqlite_busy_timeout,
+        "foreign_keys": "ON",
+    }
+    _listen_sqlite_pragmas(writer.sync_engine, pragmas)
+    _listen_sqlite_pragmas(reader.sync_engine, {**pragmas, "query_only": "ON"})
+    return async_sessionmaker[AsyncSession](
+        writer,
+        class_=PrimaryAsyncSession,
+        sync_session_class=SqliteRoutingSession,
+        info={"db_reader": reader},
+        expire_on_commit=False,
+    )
+
+
+def _listen_sqlite_pragmas(engine, pragmas: dict):
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for k, v in pragmas.items():
+            cursor.execute(f"PRAGMA {k}={v}")
+        cursor.close()
+
+
+def _listen_query_stats(engine, slow_ms: float):
+    """查询统计：累加到当前请求的DBStats，超过阈值记录慢查询（仅记录参数类型）"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        if stats := db_stats_var.get():
+            stats.count += 1
+            stats.total += elapsed
+            if elapsed > stats.slowest:
+                stats.slowest = elapsed
+                stats.slowest_sql = statement
+        if elapsed * 1000 >= slow_ms:
+            logger.warning(
+                f"Slow query {elapsed * 1000:.1f}ms: {' '.join(statement.split())} "
+                f"params={_params_shape(parameters, executemany)}"
+            )
+
+
+def _params_shape(parameters, executemany: bool = False) -> str:
+    if executemany and parameters:
+        return f"{len(parameters)}x{_params_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, list | tuple):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+def resolve_pool_size(
+    db_pool_size: int | None = None,
+    db_max_overflow: int | None = None,
+    db_pool_budget: int | None = None,
+    workers: int | None = None,
+) -> tuple[int, int]:
+    """
+    连接池大小：显式配置优先；
+    设置了全局连接预算（所有worker共享）时按worker数均分（pool_size:max_overflow约3:1），否则默认10+5
+    """
+    auto_size, auto_overflow = 10, 5
+    if db_pool_budget:
+        workers = workers or int(os.getenv("WORKERS") or os.getenv("WEB_CONCURRENCY") or 0)
+        workers = workers or multiprocessing.cpu_count() * 2 + 1
+        per_worker = max(db_pool_budget // workers, 1)
+        auto_overflow = per_worker // 4
+        auto_size = max(per_worker - auto_overflow, 1)
+        logger.debug(f"db pool budget {db_pool_budget} / {workers} workers -> {auto_size}+{auto_overflow}")
+    return (
+        db_pool_size or auto_size,
+        db_max_overflow if db_max_overflow is not None else auto_overflow,
+    )
+
+
+def _create_async_engine(
+    db_url: URL,
+    db_echo: bool,
+    db_pool_size: int,
+    db_max_overflow: int,
+    db_pool_recycle: int,
+    db_pool_timeout: float = 30,
+    db_pool_ping: str = "idle",
+    db_pool_ping_idle: float = 30,
+):
+    """
+    :param db_pool_ping: 连接存活检测：always-每次取连接都ping，idle-空闲超过阈值才ping，off-不检测
+    :param db_pool_ping_idle: idle模式的空闲阈值（秒）
+    """
+    if db_pool_ping not in ("always", "idle", "off"):
+        raise ValueError(f"Invalid pool ping mode: {db_pool_ping}")
+    kwargs = {
+        "poolclass": TimedQueuePool,
+        "pool_size": db_pool_size,
+        "max_overflow": db_max_overflow,
+        "pool_recycle": db_pool_recycle,
+        "pool_timeout": db_pool_timeout,
+    }
+    if db_url.drivername.startswith("sqlite"):
+        kwargs = {}
+        if db_url.database not in (None, "", ":memory:"):
+            kwargs["poolclass"] = TimedQueuePool  # sqlite（文件）保持默认池大小，仅统计
+    async_engine = create_async_engine(
+        url=db_url,
+        echo=db_echo,
+        pool_pre_ping=db_pool_ping == "always",
+        **kwargs,
+    )
+    if db_pool_ping == "idle":
+        _listen_idle_ping(async_engine.sync_engine, idle_seconds=db_pool_ping_idle)
+    return async_engine
+
+
+def _listen_idle_ping(engine, idle_seconds: float):
+    """取连接时仅对空闲超过阈值的连接ping，失败则由连接池重连"""
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checkin_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkin_at = connection_record.info.get("checkin_at")
+        if checkin_at is None or time.monotonic() - checkin_at < idle_seconds:
+            return
+        try:
+            alive = engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            raise sa_exc.DisconnectionError("Idle connection ping failed")
+
+
 def make_db_url(
     drivername: str,
     database: str,
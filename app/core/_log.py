@@ -1,18 +1,36 @@
+import atexit
+import contextvars
+import logging
+import logging.handlers
 import os
+import queue
+import random
+import threading
 
 from toollib.logu import init_logger as _init_logger
 
 from app.core.context import request_id_var
 
+_log_queue_handler: "QueueLogHandler | None" = None
+
 
 def init_logger(
     level: str,
     serialize: bool = False,
     outdir: str | None = None,
+    queue_enabled: bool = False,
+    queue_maxsize: int = 10000,
+    queue_policy: str = "drop",
+    queue_sample_rate: float = 0.1,
 ):
     enable_console, enable_file = True, True
     if os.getenv("APP_ENV") == "prod":
         enable_console, enable_file = False, True  # 按需调整
+    handler = (
+        QueueLogHandler(maxsize=queue_maxsize, policy=queue_policy, sample_rate=queue_sample_rate)
+        if queue_enabled
+        else None
+    )
     logger = _init_logger(
         level=level,
         request_id_var=request_id_var,
@@ -20,5 +38,185 @@ def init_logger(
         enable_console=enable_console,
         enable_file=enable_file,
         outdir=outdir,
+        **({"interception": lambda: handler} if handler else {}),  # loguru：队列作为标准库logging的拦截器
     )
+    if handler:
+        _install_log_queue(logger, handler)
     return logger
+
+
+class QueueLogHandler(logging.Handler):
+    """
+    队列日志：记录进入有界队列，由后台线程批量写出（调用方不阻塞于磁盘/控制台IO）
+    - policy（队列满时）：drop丢弃；block等待；sample队列过半时按sample_rate采样（WARNING及以上不采样），满时丢弃
+    - 记录携带调用时的上下文（如request_id），在后台线程中按该上下文格式化
+    注：关闭时（lifespan/atexit）写出剩余记录
+    """
+
+    _POLICIES = ("drop", "block", "sample")
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        policy: str = "drop",
+        sample_rate: float = 0.1,
+        batch_size: int = 500,
+    ):
+        if policy not in self._POLICIES:
+            raise ValueError(f"Invalid log queue policy '{policy}', only supported: {self._POLICIES}")
+        super().__init__()
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.targets: list[logging.Handler] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._half = maxsize // 2
+        self._thread: threading.Thread | None = None
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "sampled_out": 0, "blocked": 0, "batches": 0}
+        self._max_depth = 0
+
+    def start(self, targets: list[logging.Handler]):
+        self.targets = targets
+        self._thread = threading.Thread(target=self._run, name="log-queue", daemon=True)
+        self._thread.start()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            depth = self._queue.qsize()
+            if (
+                self.policy == "sample"
+                and depth >= self._half
+                and record.levelno < logging.WARNING
+                and random.random() >= self.sample_rate
+            ):
+                self._stats["sampled_out"] += 1
+                return
+            item = (contextvars.copy_context(), self.prepare(record))
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                if self.policy != "block":
+                    self._stats["dropped"] += 1
+                    return
+                self._stats["blocked"] += 1
+                self._queue.put(item)
+            self._stats["enqueued"] += 1
+            self._max_depth = max(self._max_depth, depth + 1)
+        except Exception:
+            self.handleError(record)
+
+    @staticmethod
+    def prepare(record: logging.LogRecord) -> logging.LogRecord:
+        # 参数与异常栈在调用方格式化（后台写出时对象可能已变化）
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+    def close(self, timeout: float = 5):
+        """写出剩余记录并停止"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        super().close()
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "depth": self._queue.qsize(),
+            "maxsize": self._queue.maxsize,
+            "max_depth": self._max_depth,
+            **self._stats,
+        }
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            batch = [item for item in batch if item is not None]
+            for target in self.targets:
+                try:
+                    _write_batch(target, batch)
+                except Exception:
+                    for _, record in batch:
+                        target.handleError(record)
+            self._stats["written"] += len(batch)
+            self._stats["batches"] += 1
+            if stop:
+                return
+
+
+def _write_batch(target: logging.Handler, batch: list[tuple[contextvars.Context, logging.LogRecord]]):
+    records = [(ctx, record) for ctx, record in batch if record.levelno >= target.level]
+    if not records:
+        return
+    if not isinstance(target, logging.StreamHandler):
+        for ctx, record in records:
+            ctx.run(target.handle, record)
+        return
+    # 流/文件：一批一次写入+flush
+    lines = [ctx.run(target.format, record) for ctx, record in records]
+    with target.lock:
+        if isinstance(target, logging.handlers.BaseRotatingHandler) and target.shouldRollover(records[0][1]):
+            target.doRollover()
+        if target.stream is None:
+            target.stream = target._open()
+        target.stream.write(target.terminator.join(lines) + target.terminator)
+        target.flush()
+
+
+class _LoguruForwarder(logging.Handler):
+    """转发至loguru（后台线程中按原记录还原调用位置与时间）"""
+
+    def __init__(self, loguru_logger):
+        super().__init__()
+        self.loguru_logger = loguru_logger
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            level = self.loguru_logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        self.loguru_logger.patch(lambda r: _restore_loguru_record(r, record)).opt(
+            exception=record.exc_info if record.exc_info and record.exc_info[0] else None,
+        ).log(level, record.getMessage())
+
+
+def _restore_loguru_record(r: dict, record: logging.LogRecord):
+    r["name"], r["module"], r["function"], r["line"] = record.name, record.module, record.funcName, record.lineno
+    r["file"].name, r["file"].path = record.filename, record.pathname
+    r["time"] = r["time"].fromtimestamp(record.created, r["time"].tzinfo)
+    r["thread"].id, r["thread"].name = record.thread, record.threadName
+
+
+def _install_log_queue(logger, handler: QueueLogHandler):
+    # 标准库logging：队列接管日志器的handlers（原handlers在后台线程中写出）
+    # loguru：队列已作为拦截器接入（见init_logger），后台线程转发至loguru；
+    #   直接调用loguru的日志不经过队列，由loguru的sink（enqueue=True）异步写出
+    global _log_queue_handler
+    if isinstance(logger, logging.Logger):
+        targets, logger.handlers = logger.handlers, []
+        logger.addHandler(handler)
+    else:
+        targets = [_LoguruForwarder(logger)]
+    handler.start(targets)
+    _log_queue_handler = handler
+    atexit.register(close_log_queue)
+
+
+def close_log_queue():
+    """写出并关闭日志队列（lifespan关闭时调用）"""
+    if _log_queue_handler is not None:
+        _log_queue_handler.close()
+
+
+def log_queue_stats() -> dict | None:
+    """日志队列统计（未启用时为None）"""
+    return None if _log_queue_handler is None else _log_queue_handler.stats()
@@ -1,3 +1,10 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from redis import exceptions as redis_exc
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
 from toollib.rediscli import RedisCli
 
 
@@ -17,3 +24,125 @@ def init_redis_cli(
         max_connections=max_connections,
         **kwargs,
     )
+
+
+def init_aredis(
+    host: str,
+    port: int,
+    db: int,
+    password: str | None = None,
+    max_connections: int | None = None,
+    pool_timeout: float | None = None,
+    **kwargs,
+) -> "AsyncRedisCli":
+    return AsyncRedisCli(
+        connection_pool=TimedBlockingConnectionPool(
+            host=host,
+            port=port,
+            db=db,
+            password=password,
+            max_connections=max_connections or 50,
+            timeout=pool_timeout,
+            **kwargs,
+        ),
+    )
+
+
+class TimedBlockingConnectionPool(BlockingConnectionPool):
+    """连接池（连接数达上限时等待；统计获取连接的等待耗时与超时次数）"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.in_use_max = 0
+
+    async def get_connection(self, *args, **kwargs):
+        start = time.perf_counter()
+        saturated = not self.can_get_connection()
+        try:
+            conn = await super().get_connection()
+        except redis_exc.ConnectionError as e:
+            if isinstance(e.__cause__, TimeoutError):
+                self.timeouts += 1
+            raise
+        wait = time.perf_counter() - start
+        self.checkouts += 1
+        self.waits += saturated
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.in_use_max = max(self.in_use_max, len(self._in_use_connections))
+        return conn
+
+
+class AsyncRedisCli(Redis):
+    """
+    异步redis客户端（共享连接池，命令执行时按需获取连接）
+
+    e.g.::
+
+        await g.aredis.get("name")
+
+        # 管道（非事务，单次往返）
+        async with g.aredis.pipe() as pipe:
+            pipe.set("name", "x", ex=60).expire("tag", 3600)
+            results = await pipe.execute()
+
+        # 事务（WATCH乐观锁，冲突时自动重试）
+        async def incr_if_lt(pipe):
+            value = int(await pipe.get("counter") or 0)
+            pipe.multi()
+            pipe.set("counter", min(value + 1, 100))
+        await g.aredis.transaction(incr_if_lt, "counter")
+    """
+
+    def pipe(self, transaction: bool = False) -> Pipeline:
+        """管道（默认非事务；`transaction=True`则MULTI/EXEC包裹）"""
+        return self.pipeline(transaction=transaction)
+
+    async def transaction(
+        self,
+        func: Callable[[Pipeline], Awaitable],
+        *watches: str,
+        value_from_callable: bool = False,
+        watch_delay: float | None = None,
+        retries: int = 10,
+    ):
+        """
+        事务（WATCH watches后执行func，期间watches被修改则重试）
+        :param func: 异步函数，参数为管道（先读取，调用`pipe.multi()`后写入）
+        :param watches: 监视的键
+        :param value_from_callable: 是否返回func的返回值（否则返回EXEC结果）
+        :param watch_delay: 重试间隔（秒）
+        :param retries: 最大重试次数（超出抛WatchError）
+        """
+        async with self.pipeline(transaction=True) as pipe:
+            for _ in range(retries):
+                try:
+                    if watches:
+                        await pipe.watch(*watches)
+                    func_value = await func(pipe)
+                    exec_value = await pipe.execute()
+                    return func_value if value_from_callable else exec_value
+                except redis_exc.WatchError:
+                    if watch_delay:
+                        await asyncio.sleep(watch_delay)
+            raise redis_exc.WatchError(f"transaction on {watches} retried {retries} times")
+
+    def pool_stats(self) -> dict:
+        """连接池统计"""
+        pool: TimedBlockingConnectionPool = self.connection_pool  # type: ignore
+        return {
+            "max_connections": pool.max_connections,
+            "in_use": len(pool._in_use_connections),
+            "idle": len(pool._available_connections),
+            "in_use_max": pool.in_use_max,
+            "checkouts": pool.checkouts,
+            "waits": pool.waits,
+            "timeouts": pool.timeouts,
+            "wait_avg_ms": round(pool.wait_total / (pool.checkouts or 1) * 1000, 3),
+            "wait_max_ms": round(pool.wait_max * 1000, 3),
+        }
@@ -1,54 +1,313 @@
 import logging
 import os
+import random
+import socket
+import threading
+import time
+import uuid
 
-from toollib.guid import SnowFlake
+from toollib.guid import SystemClockError
 from toollib.utils import localip
 
-_CACHE_KEY_SNOW_WORKER_ID_INCR = "config:snow_worker_id_incr"
-_CACHE_KEY_SNOW_DATACENTER_ID_INCR = "config:snow_datacenter_id_incr"
-_CACHE_EXPIRE_SNOW = 120
+_CACHE_KEY_SNOW_NODE = "config:snow_node"  # 租约键前缀（键：前缀:槽位，槽位 = datacenter_id * 32 + worker_id）
 
 logger = logging.getLogger(__name__)
 
 
+class SnowNodeLeaseError(RuntimeError):
+    """雪花节点租约过期或未持有（拒绝生成id，避免与其他进程重复）"""
+
+
 def init_snow_cli(
     redis_cli=None,  # `from toollib.rediscli import RedisCli` 实例
     datacenter_id: int | None = None,
-) -> SnowFlake:
-    # 建议：采用服务的方式调用api获取
-    if datacenter_id is None:
-        datacenter_id = _snow_incr(redis_cli, _CACHE_KEY_SNOW_DATACENTER_ID_INCR, _CACHE_EXPIRE_SNOW)
-        if datacenter_id is None:
-            local_ip = localip()
-            if local_ip:
-                ip_parts = list(map(int, local_ip.split(".")))
-                ip_int = (ip_parts[0] << 24) + (ip_parts[1] << 16) + (ip_parts[2] << 8) + ip_parts[3]
-                datacenter_id = ip_int % 32
-    worker_id = _snow_incr(redis_cli, _CACHE_KEY_SNOW_WORKER_ID_INCR, _CACHE_EXPIRE_SNOW)
-    if worker_id is None:
-        worker_id = os.getpid() % 32
-    return SnowFlake(worker_id=worker_id, datacenter_id=datacenter_id)
-
-
-def _snow_incr(redis_cli, cache_key: str, cache_expire: int):
-    incr = None
-    if not redis_cli:
-        return incr
-    try:
-        with redis_cli.connection() as r:
-            resp = r.ping()
-            if resp:
-                lua_script = """
-                    if redis.call('exists', KEYS[1]) == 1 then
-                        redis.call('expire', KEYS[1], ARGV[1])
-                        return redis.call('incr', KEYS[1])
-                    else
-                        redis.call('set', KEYS[1], 0)
-                        redis.call('expire', KEYS[1], ARGV[1])
-                        return 0
-                    end
-                    """
-                incr = r.eval(lua_script, 1, cache_key, cache_expire)
-    except Exception as e:
-        logger.warning(f"snow初始化id将采用本地方式，由于（{e}）")
-    return incr
+    lease_ttl: int = 60,
+) -> "SnowFlakeGenerator":
+    # 有redis时租用唯一的(datacenter_id, worker_id)，并定时续约；否则按本机ip与pid分配（多节点时可能重复）
+    # 注：有redis但租用失败时不回落本地分配，租到之前拒绝生成id（后台持续重试）
+    lease = SnowNodeLease(redis_cli, datacenter_id=datacenter_id, ttl=lease_ttl) if redis_cli else None
+    node = lease.acquire() if lease else None
+    if lease is None:
+        node = (_local_datacenter_id() if datacenter_id is None else datacenter_id, os.getpid() % 32)
+        logger.warning(f"snow node（datacenter_id, worker_id）{node} 采用本地方式分配，多进程/多节点时可能重复")
+    elif node is None:
+        node = (datacenter_id or 0, 0)
+        logger.error("snow node lease not acquired, refusing to generate ids until it is (retrying)")
+    datacenter_id, worker_id = node
+    snow_cli = SnowFlakeGenerator(worker_id=worker_id, datacenter_id=datacenter_id)
+    if lease:
+        snow_cli.lease = lease
+        lease.start(on_change=snow_cli.set_node)
+    return snow_cli
+
+
+def _local_datacenter_id() -> int:
+    if local_ip := localip():
+        ip_parts = list(map(int, local_ip.split(".")))
+        ip_int = (ip_parts[0] << 24) + (ip_parts[1] << 16) + (ip_parts[2] << 8) + ip_parts[3]
+        return ip_int % 32
+    return 0
+
+
+class SnowNodeLease:
+    """
+    雪花节点租约：每个槽位一个redis键（SET NX PX），持有者定时续约，退出时释放
+    - 槽位 = datacenter_id * 32 + worker_id；指定datacenter_id时仅在该数据中心的32个槽位中租用
+    - 续约失败（键过期或被占用）时重新租用，并通过on_change切换生成器的节点
+    - 有效期：以最近一次成功租用/续约的发起时间+ttl计（不晚于redis中键的过期），过期后生成器拒绝生成id直至续约或重新租用
+    注：进程异常退出时槽位在ttl后释放；fork后需调用`SnowFlakeGenerator.after_fork()`重新租用
+    """
+
+    _ACQUIRE_SCRIPT = """
+        local n = tonumber(ARGV[3])
+        for i = 0, n - 1 do
+            local slot = tonumber(ARGV[4]) + (tonumber(ARGV[5]) + i) % n
+            if redis.call('set', KEYS[1] .. ':' .. slot, ARGV[1], 'NX', 'PX', ARGV[2]) then
+                return slot
+            end
+        end
+        return -1
+        """
+    _RENEW_SCRIPT = """
+        if redis.call('get', KEYS[1]) == ARGV[1] then
+            return redis.call('pexpire', KEYS[1], ARGV[2])
+        end
+        return 0
+        """
+    _RELEASE_SCRIPT = """
+        if redis.call('get', KEYS[1]) == ARGV[1] then
+            return redis.call('del', KEYS[1])
+        end
+        return 0
+        """
+
+    def __init__(self, redis_cli, datacenter_id: int | None = None, ttl: int = 60):
+        self.redis_cli = redis_cli
+        self.datacenter_id = datacenter_id
+        self.ttl = ttl
+        self.slot: int | None = None
+        self.expires_at = 0.0  # 租约有效期（time.monotonic）
+        self._token = ""
+        self._on_change = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def node(self) -> tuple[int, int] | None:
+        """(datacenter_id, worker_id)"""
+        return None if self.slot is None else divmod(self.slot, 32)
+
+    def valid(self, datacenter_id: int, worker_id: int) -> bool:
+        """租约是否有效且为该节点（生成id前检查）"""
+        return self.slot == datacenter_id * 32 + worker_id and time.monotonic() < self.expires_at
+
+    def acquire(self) -> tuple[int, int] | None:
+        """租用槽位（从随机位置开始尝试，单次往返），失败返回None"""
+        self._token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        base, n = (0, 1024) if self.datacenter_id is None else (self.datacenter_id * 32, 32)
+        sent = time.monotonic()
+        try:
+            with self.redis_cli.connection() as r:
+                slot = r.eval(
+                    self._ACQUIRE_SCRIPT,
+                    1,
+                    _CACHE_KEY_SNOW_NODE,
+                    self._token,
+                    self.ttl * 1000,
+                    n,
+                    base,
+                    random.randrange(n),
+                )
+        except Exception as e:
+            logger.warning(f"snow node lease acquire failed: {e}")
+            return None
+        if slot < 0:
+            logger.error(f"snow node lease acquire failed: all {n} slots are in use")
+            return None
+        self.slot, self.expires_at = slot, sent + self.ttl
+        logger.info(f"snow node lease acquired: {self.node}")
+        return self.node
+
+    def start(self, on_change=None):
+        """启动续约（守护线程，间隔ttl/3）"""
+        self._on_change = on_change
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._heartbeat, name="snow-lease", daemon=True)
+        self._thread.start()
+
+    def release(self):
+        """停止续约并释放槽位"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+        if self.slot is None:
+            return
+        try:
+            with self.redis_cli.connection() as r:
+                r.eval(self._RELEASE_SCRIPT, 1, f"{_CACHE_KEY_SNOW_NODE}:{self.slot}", self._token)
+            logger.info(f"snow node lease released: {self.node}")
+        except Exception as e:
+            logger.warning(f"snow node lease release failed: {e}")
+        self.slot, self.expires_at = None, 0.0
+
+    def after_fork(self) -> tuple[int, int] | None:
+        """fork后（子进程）重新租用：父进程的续约线程不会被继承，槽位仍归父进程；租用失败时后台持续重试"""
+        self._stop = threading.Event()
+        self._thread = None
+        self.slot, self.expires_at = None, 0.0
+        node = self.acquire()
+        self.start(on_change=self._on_change)
+        return node
+
+    def _heartbeat(self):
+        retry = min(self.ttl / 10, 1)  # 失败后的重试间隔
+        wait = self.ttl / 3 if self.slot is not None else retry
+        while not self._stop.wait(wait):
+            wait = self.ttl / 3
+            if self.slot is None:
+                if self.acquire() is None:
+                    wait = retry
+                elif self._on_change:
+                    self._on_change(*self.node)
+                continue
+            sent = time.monotonic()
+            try:
+                with self.redis_cli.connection() as r:
+                    renewed = r.eval(
+                        self._RENEW_SCRIPT, 1, f"{_CACHE_KEY_SNOW_NODE}:{self.slot}", self._token, self.ttl * 1000
+                    )
+            except Exception as e:
+                logger.warning(f"snow node lease renew failed: {e}")
+                wait = retry
+                continue
+            if renewed:
+                self.expires_at = sent + self.ttl
+                continue
+            logger.error(f"snow node lease lost: {self.node}, re-acquiring")
+            self.slot, self.expires_at = None, 0.0
+            if self.acquire() is None:
+                wait = retry
+            elif self._on_change:
+                self._on_change(*self.node)
+
+
+class SnowFlakeGenerator:
+    """
+    雪花id生成器（线程安全，与`toollib.guid.SnowFlake`的位布局一致）
+    - gen_many: 一次预留整段序号（每毫秒最多2^sequence_bits个），避免逐个生成的加锁与调用开销
+    - 当前毫秒序号用尽时等待至下一毫秒（剩余较长时sleep，否则让出CPU自旋）
+    - 时钟回拨不超过max_backwards_ms时等待追平，否则抛SystemClockError
+    """
+
+    def __init__(
+        self,
+        worker_id: int = 0,
+        datacenter_id: int = 0,
+        epoch_timestamp: int = 1288834974657,
+        worker_id_bits: int = 5,
+        datacenter_id_bits: int = 5,
+        sequence_bits: int = 12,
+        max_backwards_ms: int = 5,
+    ):
+        if not 0 <= worker_id < (1 << worker_id_bits):
+            raise ValueError(f'"worker_id" only supported: 0 ~ {(1 << worker_id_bits) - 1}')
+        if not 0 <= datacenter_id < (1 << datacenter_id_bits):
+            raise ValueError(f'"datacenter_id" only supported: 0 ~ {(1 << datacenter_id_bits) - 1}')
+        self.worker_id = worker_id
+        self.datacenter_id = datacenter_id
+        self.epoch_timestamp = epoch_timestamp
+        self.max_backwards_ms = max_backwards_ms
+        self.timestamp_left_shift = sequence_bits + worker_id_bits + datacenter_id_bits
+        self.sequence_size = 1 << sequence_bits
+        self.worker_id_shift = sequence_bits
+        self.datacenter_id_shift = sequence_bits + worker_id_bits
+        self.last_timestamp = -1
+        self.sequence = 0  # 当前毫秒下一个可用序号
+        self.lease: SnowNodeLease | None = None
+        self._node = (datacenter_id << self.datacenter_id_shift) | (worker_id << self.worker_id_shift)
+        self._lock = threading.Lock()
+
+    def set_node(self, datacenter_id: int, worker_id: int):
+        """切换节点（租约变更时）"""
+        with self._lock:
+            self.datacenter_id, self.worker_id = datacenter_id, worker_id
+            self._node = (datacenter_id << self.datacenter_id_shift) | (worker_id << self.worker_id_shift)
+
+    def after_fork(self):
+        """fork后（子进程）调用：重新租用节点，无租约时按pid重新分配worker_id（如gunicorn的post_fork）"""
+        self._lock = threading.Lock()
+        if self.lease:
+            if (node := self.lease.after_fork()) is not None:
+                self.set_node(*node)
+            else:
+                logger.error("snow node lease not acquired after fork, refusing to generate ids until it is (retrying)")
+            return
+        node = (self.datacenter_id, os.getpid() % 32)
+        logger.error(f"snow node {node} assigned by pid after fork (no lease), ids may collide across nodes")
+        self.set_node(*node)
+
+    def close(self):
+        """释放租约（lifespan关闭时调用）"""
+        if self.lease:
+            self.lease.release()
+
+    def gen_uid(self, to_str: bool = False) -> int | str:
+        """生成id"""
+        with self._lock:
+            timestamp = time.time_ns() // 1_000_000
+            if timestamp == self.last_timestamp and self.sequence < self.sequence_size:  # 同一毫秒（常见路径）
+                start = self.sequence
+                self.sequence = start + 1
+            else:
+                timestamp, start, _ = self._reserve(1)
+            uid = ((timestamp - self.epoch_timestamp) << self.timestamp_left_shift) | self._node | start
+        return str(uid) if to_str else uid
+
+    def gen_many(self, n: int, to_str: bool = False) -> list[int] | list[str]:
+        """批量生成id（递增）"""
+        uids = []
+        with self._lock:
+            while len(uids) < n:
+                timestamp, start, count = self._reserve(n - len(uids))
+                base = ((timestamp - self.epoch_timestamp) << self.timestamp_left_shift) | self._node
+                uids.extend(range(base + start, base + start + count))
+        return list(map(str, uids)) if to_str else uids
+
+    def _reserve(self, n: int) -> tuple[int, int, int]:
+        # 预留序号段：(毫秒时间戳, 起始序号, 数量)
+        # 租约在每毫秒首次生成时检查（同一毫秒内的快速路径不再检查）
+        if self.lease is not None and not self.lease.valid(self.datacenter_id, self.worker_id):
+            raise SnowNodeLeaseError(f"snow node lease expired or not held: {(self.datacenter_id, self.worker_id)}")
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp < self.last_timestamp:
+            timestamp = self._wait_backwards(timestamp)
+        if timestamp > self.last_timestamp:
+            self.last_timestamp, self.sequence = timestamp, 0
+        elif self.sequence >= self.sequence_size:
+            self.last_timestamp, self.sequence = self._til_next_millis(self.last_timestamp), 0
+        start = self.sequence
+        count = min(n, self.sequence_size - start)
+        self.sequence += count
+        return self.last_timestamp, start, count
+
+    def _wait_backwards(self, timestamp: int) -> int:
+        offset = self.last_timestamp - timestamp
+        if offset > self.max_backwards_ms:
+            raise SystemClockError(f"Clock moved backwards. Refusing to generate id for {offset} milliseconds")
+        logger.warning(f"snow clock moved backwards {offset}ms, waiting")
+        time.sleep(offset / 1000)
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp < self.last_timestamp:
+            raise SystemClockError(f"Clock moved backwards. Refusing to generate id for {offset} milliseconds")
+        return timestamp
+
+    @staticmethod
+    def _til_next_millis(last_timestamp: int) -> int:
+        while True:
+            now = time.time_ns()
+            if now // 1_000_000 > last_timestamp:
+                return now // 1_000_000
+            remain = (last_timestamp + 1) * 1_000_000 - now
+            time.sleep(remain / 1e9 if remain > 200_000 else 0)
+
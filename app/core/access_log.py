@@ -0,0 +1,154 @@
+"""
+访问日志（应用层，JSON行）
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import time
+from pathlib import Path
+
+from app.core import g
+from app.core.context import DBStats
+
+try:
+    import orjson as json
+except ImportError:
+    import json
+
+logger = logging.getLogger(__name__)
+_sink_logger = logging.getLogger("access")  # 未配置文件时的输出
+
+
+class AccessLogger:
+    """
+    访问日志：请求结束时由HttpMiddleware记录，缓冲后由后台任务批量写出（线程中写，不阻塞事件循环）
+    - 字段：ts, request_id, method, route（路由模板）, path, status, latency_ms, db_count, db_ms, client
+      有数据库查询时另含db_slowest_ms, db_slowest_sql（最慢语句，截取前slowest_sql_len个字符）
+    - 采样：状态码<400按sample_rate采样，>=400全部记录
+    - 输出：APP_ACCESS_LOG_FILE（文件，批量写入）；为空则逐条经日志器access输出
+      （与应用日志共用sink，避免各自写stdout时交错）
+    注：开启后可关闭服务器（uvicorn/gunicorn）自带的访问日志，避免重复
+    """
+
+    def __init__(
+        self,
+        interval: float = 1,
+        batch_size: int = 1000,
+        max_pending: int = 100000,
+        slowest_sql_len: int = 500,
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.slowest_sql_len = slowest_sql_len
+        self._pending: list[bytes] = []
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        self._file = None
+        self._stats = {"logged": 0, "sampled_out": 0, "dropped": 0, "written": 0, "batches": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return g.config.APP_ACCESS_LOG
+
+    def log(
+        self,
+        scope: dict,
+        request_id: str,
+        status_code: int,
+        latency: float,
+        db_stats: DBStats | None = None,
+    ):
+        if status_code < 400 and random.random() >= g.config.APP_ACCESS_LOG_SAMPLE_RATE:
+            self._stats["sampled_out"] += 1
+            return
+        if len(self._pending) >= self.max_pending:
+            self._stats["dropped"] += 1
+            return
+        route = scope.get("route")
+        client = scope.get("client")
+        entry = {
+            "ts": round(time.time(), 3),
+            "request_id": request_id,
+            "method": scope["method"],
+            "route": getattr(route, "path", None),
+            "path": scope["path"],
+            "status": status_code,
+            "latency_ms": round(latency * 1000, 2),
+            "db_count": db_stats.count if db_stats else 0,
+            "db_ms": round(db_stats.total * 1000, 2) if db_stats else 0.0,
+            "client": client[0] if client else None,
+        }
+        if db_stats and db_stats.count:
+            entry["db_slowest_ms"] = round(db_stats.slowest * 1000, 2)
+            entry["db_slowest_sql"] = db_stats.slowest_sql[: self.slowest_sql_len]
+        line = json.dumps(entry)
+        self._pending.append(line if isinstance(line, bytes) else line.encode())
+        self._stats["logged"] += 1
+        self._ensure_task()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """写出缓冲"""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            await asyncio.to_thread(self._write, pending)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"access log write failed: {e}")
+            return
+        self._stats["written"] += len(pending)
+        self._stats["batches"] += 1
+
+    async def close(self):
+        """停止定时写出并写出剩余（lifespan关闭时调用）"""
+        # 不取消任务（写出在线程中进行，取消会与最后一次写出并发），通知其写完后退出
+        if self._task is not None and not self._task.done():
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+        self._task, self._closing = None, False
+        await self.flush()
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+
+    def stats(self) -> dict:
+        return {"pending": len(self._pending), **self._stats}
+
+    def _write(self, lines: list[bytes]):
+        if not (filename := g.config.APP_ACCESS_LOG_FILE):
+            for line in lines:
+                _sink_logger.info(line.decode())
+            return
+        if self._file is None:
+            Path(filename).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(filename, "ab")
+        self._file.write(b"\n".join(lines) + b"\n")
+        self._file.flush()
+
+    def _ensure_task(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            # 空上下文：首次记录所在请求的上下文变量（request_id、查询统计等）不带入后台任务
+            self._task = asyncio.get_running_loop().create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            if self._closing:
+                return
+
+
+access_logger = AccessLogger()
@@ -0,0 +1,197 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
+import inspect
+import logging
+import math
+import random
+import time
+from collections.abc import Callable, Sequence
+
+from app.core import g
+from app.utils.cache_util import TTLCache
+
+try:
+    import orjson as json
+except ImportError:
+    import json
+
+try:
+    from app.core._db import primary_reads
+except ImportError:  # 未集成数据库
+    primary_reads = contextlib.nullcontext
+
+_KEY_PREFIX = "cache:fn"
+_TAG_PREFIX = "cache:tag"
+_VER_PREFIX = "cache:tagver"  # 标签版本（失效时递增，回填时校验）
+_TAG_EXPIRE = 86400  # 标签集合过期（不短于其下缓存键的ttl）
+
+_local = TTLCache(maxsize=10000, ttl=10)
+_local_tags = TTLCache(maxsize=40000, ttl=10)  # 标签 -> 缓存键集合（ttl刷新不短于其下的缓存键）
+_inflight: dict[str, asyncio.Future] = {}
+_epoch = 0  # 失效计数（执行期间发生失效则不回填，避免写入旧值）
+
+logger = logging.getLogger(__name__)
+
+
+def cached(
+    ttl: int = 60,
+    tags: Sequence[str] = (),
+    local_ttl: float = 10,
+    beta: float = 1.0,
+):
+    """
+    结果缓存（异步函数）：进程内LRU -> redis -> 执行函数
+    - 键：函数全名 + 参数（md5；方法不含首参self/cls）
+    - 标签：格式化字符串（取函数参数），如`"user:{user_id}"`，通过`invalidate_tags`失效
+    - 回填带标签版本校验：执行前读取标签版本，执行期间（任一进程）发生失效则不回填，避免写入旧值
+    - 执行期间只读会话走主库（从库延迟时可能读到失效前的数据并回填）
+    - 防击穿：同一进程同一键并发只执行一次；临近过期时按概率提前刷新（XFetch，beta越大越提前）
+    注：返回值需可JSON序列化；异常不缓存；未集成redis时仅进程内缓存；
+        其他进程的进程内缓存在local_ttl内过期（失效实时性要求高时调小local_ttl）
+    e.g.::
+
+        @staticmethod
+        @cached(ttl=300, tags=("user:{user_id}",))
+        async def get_user(user_id: str): ...
+
+        await invalidate_tags(f"user:{user_id}")
+    """
+
+    def decorator(func: Callable):
+        sig = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+        # 方法的self/cls不入键（其repr含对象地址，各进程、各实例不同）
+        skip_first = next(iter(sig.parameters), None) in ("self", "cls")
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = sorted(list(bound.arguments.items())[1 if skip_first else 0 :])
+            key = f"{_KEY_PREFIX}:{name}:{hashlib.md5(repr(arguments).encode()).hexdigest()}"
+            entry = await _get(key, local_ttl)
+            if entry is not None and not _should_refresh(entry, beta):
+                return entry["v"]
+            if (fut := _inflight.get(key)) is not None:
+                try:
+                    return json.loads(await asyncio.shield(fut))["v"]
+                except asyncio.CancelledError:
+                    if not fut.cancelled():
+                        raise
+                    # 执行者被取消，自行执行
+            fut = asyncio.get_running_loop().create_future()
+            _inflight[key] = fut
+            try:
+                tag_names = [t.format(**bound.arguments) for t in tags]
+                epoch, start = _epoch, time.monotonic()
+                versions = await _tag_versions(tag_names)
+                with primary_reads():
+                    value = await func(*args, **kwargs)
+                raw = json.dumps({"v": value, "d": time.monotonic() - start, "e": time.time() + ttl})
+                if epoch == _epoch:
+                    await _set(key, raw, ttl, local_ttl, tag_names, versions)
+                fut.set_result(raw)
+                return value
+            except asyncio.CancelledError:
+                fut.cancel()
+                raise
+            except Exception as e:
+                fut.set_exception(e)
+                fut.exception()  # 无等待者时避免告警
+                raise
+            finally:
+                if _inflight.get(key) is fut:
+                    del _inflight[key]
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate_tags(*tags: str):
+    """按标签失效（本进程+redis：删除标签下的缓存键并递增标签版本）"""
+    global _epoch
+    _epoch += 1
+    for tag in tags:
+        for key in _local_tags.get(tag) or ():
+            _local.delete(key)
+        _local_tags.delete(tag)
+    if aredis := getattr(g, "aredis", None):
+        try:
+            tag_keys = [f"{_TAG_PREFIX}:{tag}" for tag in tags]
+            async with aredis.pipe(transaction=True) as pipe:
+                for tag, tag_key in zip(tags, tag_keys, strict=True):
+                    pipe.smembers(tag_key).incr(_ver_key(tag)).expire(_ver_key(tag), _TAG_EXPIRE)
+                members = (await pipe.execute())[::3]
+            if keys := set().union(*members):
+                await aredis.delete(*keys, *tag_keys)
+            else:
+                await aredis.delete(*tag_keys)
+        except Exception as e:
+            logger.warning(f"cache invalidate tags {tags} failed: {e}")
+
+
+async def _get(key: str, local_ttl: float) -> dict | None:
+    raw = _local.get(key)
+    if raw is not None:
+        return json.loads(raw)
+    if aredis := getattr(g, "aredis", None):
+        try:
+            raw = await aredis.get(key)
+        except Exception as e:
+            logger.warning(f"cache get {key} failed: {e}")
+        if raw is not None:
+            entry = json.loads(raw)
+            _local.set(key, raw, ttl=max(min(local_ttl, entry["e"] - time.time()), 0.001))
+            return entry
+    return None
+
+
+async def _tag_versions(tags: list[str]) -> list | None:
+    # 标签版本（未集成redis或无标签时[]，读取失败时None：不回填redis）
+    if not tags or not (aredis := getattr(g, "aredis", None)):
+        return []
+    try:
+        return await aredis.mget(*(_ver_key(tag) for tag in tags))
+    except Exception as e:
+        logger.warning(f"cache get tag versions {tags} failed: {e}")
+        return None
+
+
+async def _set(key: str, raw: str | bytes, ttl: int, local_ttl: float, tags: list[str], versions: list | None):
+    if (aredis := getattr(g, "aredis", None)) and versions is not None:
+        ver_keys = [_ver_key(tag) for tag in tags]
+
+        async def fill(pipe) -> bool:
+            # 标签版本未变（执行期间无失效）才回填
+            if ver_keys and await pipe.mget(*ver_keys) != versions:
+                return False
+            pipe.multi()
+            pipe.set(key, raw, ex=ttl)
+            for tag in tags:
+                tag_key = f"{_TAG_PREFIX}:{tag}"
+                pipe.sadd(tag_key, key)
+                pipe.expire(tag_key, max(ttl, _TAG_EXPIRE))
+            return True
+
+        try:
+            if not await aredis.transaction(fill, *ver_keys, value_from_callable=True, retries=1):
+                return  # 执行期间已失效
+        except Exception as e:
+            logger.warning(f"cache set {key} failed: {e}")
+    _local.set(key, raw, ttl=min(local_ttl, ttl))
+    for tag in tags:
+        keys = _local_tags.get(tag) or set()
+        keys.add(key)
+        _local_tags.set(tag, keys, ttl=local_ttl)
+
+
+def _ver_key(tag: str) -> str:
+    return f"{_VER_PREFIX}:{tag}"
+
+
+def _should_refresh(entry: dict, beta: float) -> bool:
+    # XFetch：now - delta * beta * ln(rand) >= expiry
+    return time.time() - entry["d"] * beta * math.log(random.random() or 1e-12) >= entry["e"]
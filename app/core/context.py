@@ -1,3 +1,17 @@
 from contextvars import ContextVar
+from dataclasses import dataclass
 
 request_id_var: ContextVar[str] = ContextVar("request_id", default="N/A")
+
+
+@dataclass(slots=True)
+class DBStats:
+    """请求内数据库查询统计（耗时单位：秒）"""
+
+    count: int = 0
+    total: float = 0.0
+    slowest: float = 0.0
+    slowest_sql: str = ""
+
+
+db_stats_var: ContextVar[DBStats | None] = ContextVar("db_stats", default=None)
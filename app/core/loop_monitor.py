@@ -0,0 +1,161 @@
+"""
+事件循环监控（阻塞检测）
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from app.core import g
+from app.core.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+_REQUEST_FRAME = "HttpMiddleware.__call__"  # 据此栈帧取正在处理的请求（request_id, scope）
+
+
+class LoopMonitor:
+    """
+    事件循环监控：
+    - 心跳：循环内每interval秒sleep一次，实际唤醒延迟即循环延迟（lag），计入直方图event_loop_lag_seconds
+    - 看门狗：独立线程检查心跳，超过threshold未唤醒即循环被阻塞，此时抓取循环线程的调用栈，
+      记录阻塞位置及正在处理的请求（request_id, route）
+    - 同一次阻塞只记录一次；cooldown秒内最多记录一次调用栈，其余仅计数（下次记录时汇总）
+    注：阻塞时长在[threshold, threshold+interval)之间时可能仅由心跳记录延迟（无调用栈）
+    """
+
+    def __init__(
+        self,
+        threshold: float | None = None,
+        interval: float | None = None,
+        cooldown: float = 10,
+        stack_limit: int = 30,
+    ):
+        self._threshold = threshold
+        self._interval = interval
+        self.cooldown = cooldown
+        self.stack_limit = stack_limit
+        self._loop_thread_id: int | None = None
+        self._last_beat = 0.0
+        self._beat_seq = 0
+        self._reported_seq = -1  # 看门狗已处理的心跳序号（同一次阻塞只处理一次）
+        self._last_report = 0.0
+        self._suppressed = 0
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._stats = {"stalls": 0, "stacks": 0, "max_lag_ms": 0.0}
+
+    @property
+    def enabled(self) -> bool:
+        return g.config.APP_LOOP_MONITOR
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold or g.config.APP_LOOP_STALL_THRESHOLD
+
+    @property
+    def interval(self) -> float:
+        return self._interval or self.threshold / 2
+
+    def start(self):
+        """启动（lifespan启动时在事件循环中调用）"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watchdog, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    async def close(self):
+        """停止（lifespan关闭时调用）"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {"threshold_ms": round(self.threshold * 1000, 1), **self._stats}
+
+    async def _heartbeat(self):
+        interval, threshold = self.interval, self.threshold
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            lag = max(now - start - interval, 0.0)
+            reported = self._reported_seq == self._beat_seq  # 看门狗已处理（记录调用栈或计入抑制）
+            self._last_beat = now
+            self._beat_seq += 1
+            EVENT_LOOP_LAG.observe(lag)
+            if lag < threshold:
+                continue
+            self._stats["stalls"] += 1
+            self._stats["max_lag_ms"] = max(self._stats["max_lag_ms"], round(lag * 1000, 1))
+            EVENT_LOOP_STALLS.inc()
+            if reported:
+                logger.info(f"event loop stall ended after {lag * 1000:.1f}ms")
+            elif self._allow_report():
+                logger.warning(f"event loop stalled {lag * 1000:.1f}ms (shorter than watchdog check, no stack)")
+
+    def _watchdog(self):
+        # 按心跳的截止时间等待（正常时每次心跳后约一次唤醒），阻塞期间每threshold/4检查一次
+        wait = self.threshold
+        while not self._stop.wait(wait):
+            seq = self._beat_seq
+            blocked = time.monotonic() - self._last_beat - self.interval
+            wait = max(self.threshold - blocked, self.threshold / 4)
+            if blocked < self.threshold or seq == self._reported_seq:
+                continue
+            self._reported_seq = seq
+            if self._allow_report():
+                self._report(blocked)
+
+    def _allow_report(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_report < self.cooldown:
+            self._suppressed += 1
+            return False
+        self._last_report = now
+        return True
+
+    def _report(self, blocked: float):
+        # 在看门狗线程中执行：循环线程此时阻塞，其调用栈即阻塞位置
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        request_id, route = self._request_info(frame)
+        stack = "".join(traceback.format_stack(frame)[-self.stack_limit :])
+        suppressed, self._suppressed = self._suppressed, 0
+        self._stats["stacks"] += 1
+        logger.warning(
+            f"event loop blocked for {blocked * 1000:.0f}ms+ | request_id={request_id} route={route}"
+            + (f" | suppressed {suppressed} similar within {self.cooldown:g}s" if suppressed else "")
+            + f"\nStack (most recent call last):\n{stack}"
+        )
+
+    @staticmethod
+    def _request_info(frame) -> tuple[str | None, str | None]:
+        while frame is not None:
+            if frame.f_code.co_qualname == _REQUEST_FRAME:
+                f_locals = frame.f_locals
+                scope = f_locals.get("scope") or {}
+                route = scope.get("route")
+                return f_locals.get("request_id"), getattr(route, "path", None) or scope.get("path")
+            frame = frame.f_back
+        return None, None
+
+
+loop_monitor = LoopMonitor()
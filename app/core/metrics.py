@@ -0,0 +1,183 @@
+"""
+指标（prometheus）
+"""
+
+import os
+import threading
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.core import g
+
+try:
+    from celery import signals as celery_signals
+except ImportError:
+    celery_signals = None
+
+# 多进程（gunicorn/uvicorn --workers）：各进程写入该目录下的mmap文件，/metrics汇总所有进程
+# 注：需在导入prometheus_client前设置（见config/.env、config/gunicorn.conf.py）
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+_UNMATCHED_ROUTE = "<unmatched>"  # 未匹配路由（避免按原始路径产生过多标签）
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP请求数",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP请求耗时",
+    ("method", "route"),
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "处理中的HTTP请求数",
+    ("method",),
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "数据库连接池连接数（state: size/checked_in/checked_out/overflow）",
+    ("pool", "state"),
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total",
+    "数据库连接池获取连接次数",
+    ("pool",),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total",
+    "数据库连接池获取连接超时次数",
+    ("pool",),
+)
+CELERY_PUBLISH = Counter(
+    "celery_publish_total",
+    "celery任务发布数",
+    ("task",),
+)
+CELERY_PUBLISH_DURATION = Histogram(
+    "celery_publish_duration_seconds",
+    "celery任务发布耗时",
+    ("task",),
+    buckets=_LATENCY_BUCKETS,
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "事件循环延迟（见loop_monitor）",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EVENT_LOOP_STALLS = Counter(
+    "event_loop_stalls_total",
+    "事件循环阻塞次数（延迟超过APP_LOOP_STALL_THRESHOLD）",
+)
+
+
+class AppMetrics:
+    """
+    应用指标：由HttpMiddleware记录请求，/metrics输出
+    - 请求：按(method, route模板, status)计数，按(method, route模板)统计耗时，按method统计处理中
+    - 数据库连接池：请求结束时刷新（间隔pool_refresh_interval秒）
+    - celery：任务发布数与耗时（before/after_task_publish信号）
+    注：多进程时需设置PROMETHEUS_MULTIPROC_DIR（进程退出时由close/gunicorn的child_exit标记，处理中等gauge不再计入）
+    """
+
+    def __init__(self, pool_refresh_interval: float = 5):
+        self.pool_refresh_interval = pool_refresh_interval
+        self._pool_refreshed = 0.0
+        self._pool_counts: dict[tuple[str, str], int] = {}
+        # 带标签的子指标缓存（labels()每次需加锁查找）；键由路由模板/状态码组成，数量有限
+        self._request_children: dict[tuple[str, str, int], tuple] = {}
+        self._in_progress_children: dict[str, Gauge] = {}
+        self._publish_start = threading.local()
+        if celery_signals is not None:
+            celery_signals.before_task_publish.connect(self._before_task_publish, weak=False)
+            celery_signals.after_task_publish.connect(self._after_task_publish, weak=False)
+
+    @property
+    def enabled(self) -> bool:
+        return g.config.APP_METRICS
+
+    def request_started(self, method: str):
+        self._in_progress(method).inc()
+
+    def request_finished(self, scope: dict, status_code: int, latency: float):
+        method = scope["method"]
+        route = getattr(scope.get("route"), "path", None) or _UNMATCHED_ROUTE
+        self._in_progress(method).dec()
+        key = (method, route, status_code)
+        if (children := self._request_children.get(key)) is None:
+            children = self._request_children[key] = (
+                HTTP_REQUESTS.labels(method, route, str(status_code)),
+                HTTP_REQUEST_DURATION.labels(method, route),
+            )
+        children[0].inc()
+        children[1].observe(latency)
+        if (now := time.monotonic()) - self._pool_refreshed >= self.pool_refresh_interval:
+            self._pool_refreshed = now
+            self.refresh_pools()
+
+    def refresh_pools(self):
+        """刷新数据库连接池指标"""
+        if not (db_async_session_ro := getattr(g, "db_async_session_ro", None)):
+            return
+        for stats in db_async_session_ro.pool_stats():
+            pool = stats["name"]
+            for state in ("size", "checked_in", "checked_out", "overflow"):
+                if state in stats:
+                    DB_POOL_CONNECTIONS.labels(pool, state).set(stats[state])
+            # 连接池内为累计值，按增量计入counter
+            for counter, key in ((DB_POOL_CHECKOUTS, "checkouts"), (DB_POOL_TIMEOUTS, "timeouts")):
+                if key in stats:
+                    last = self._pool_counts.get((pool, key), 0)
+                    if stats[key] > last:
+                        counter.labels(pool).inc(stats[key] - last)
+                    self._pool_counts[(pool, key)] = stats[key]
+
+    def render(self) -> tuple[bytes, str]:
+        """输出（多进程时汇总所有进程）"""
+        self.refresh_pools()
+        if MULTIPROC_DIR:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    def close(self):
+        """标记本进程退出（lifespan关闭时调用）"""
+        if MULTIPROC_DIR:
+            multiprocess.mark_process_dead(os.getpid())
+
+    def _in_progress(self, method: str) -> Gauge:
+        if (child := self._in_progress_children.get(method)) is None:
+            child = self._in_progress_children[method] = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        return child
+
+    def _before_task_publish(self, sender=None, **kwargs):
+        self._publish_start.value = time.perf_counter()
+
+    def _after_task_publish(self, sender=None, **kwargs):
+        task = sender or "unknown"
+        CELERY_PUBLISH.labels(task).inc()
+        if (start := getattr(self._publish_start, "value", None)) is not None:
+            CELERY_PUBLISH_DURATION.labels(task).observe(time.perf_counter() - start)
+            self._publish_start.value = None
+
+
+app_metrics = AppMetrics()
@@ -3,19 +3,25 @@
 """
 
 import logging
+import random
+import time
 import uuid
+from collections import OrderedDict
 
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core import g
-from app.core.context import request_id_var
+from app.core.access_log import access_logger
+from app.core.context import DBStats, db_stats_var, request_id_var
 from app.core.exceptions import CustomException
+from app.core.metrics import app_metrics
 from app.core.responses import Responses
 from app.core.status import Status
 
@@ -24,6 +30,7 @@ __all__ = [
 ]
 
 logger = logging.getLogger(__name__)
+_UNMATCHED_ROUTE = "<unmatched>"  # 未匹配路由（如扫描产生的404）归为一组，与指标一致
 
 
 def add_middleware_and_exceptions(app: FastAPI):
@@ -36,34 +43,74 @@ def add_middleware_and_exceptions(app: FastAPI):
     app.add_exception_handler(HTTPException, ExceptionsHandler.http_exception_handler)
 
 
-class HttpMiddleware(BaseHTTPMiddleware):
+class HttpMiddleware:
+    """
+    HTTP中间件（纯ASGI实现，流式响应直接透传）
+    """
+
     _HEADERS = {
         # 可添加相关头
     }
+    _REQUEST_ID_KEY = "X-Request-ID"
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
-        request_id_key = "X-Request-ID"
-        request_id = await self._get_or_create_request_id(request, key=request_id_key)
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope, receive=receive)
+        request_id = self._get_or_create_request_id(request, key=self._REQUEST_ID_KEY)
         token = request_id_var.set(request_id)
+        db_stats = DBStats()
+        db_token = db_stats_var.set(db_stats)
         request.state.request_id = request_id
+        response_started = False
+        status_code = Status.INTERNAL_SERVER_ERROR.status_code
+        metrics_enabled = app_metrics.enabled
+        if metrics_enabled:
+            app_metrics.request_started(scope["method"])
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started, status_code
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers[self._REQUEST_ID_KEY] = request_id
+                if db_stats.count:
+                    headers.append("Server-Timing", f"db;dur={db_stats.total * 1000:.1f}")
+                for key, value in self._HEADERS.items():
+                    if key not in headers:
+                        headers[key] = value
+            await send(message)
+
         try:
-            response = await call_next(request)
-            response.headers[request_id_key] = request_id
-            for key, value in self._HEADERS.items():
-                if key not in response.headers:
-                    response.headers[key] = value
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
-            return await self.handle_exception(request, exc)
+            if response_started:  # 响应已开始发送，无法再返回错误响应
+                raise
+            response = await self.handle_exception(request, exc)
+            await response(scope, receive, send_wrapper)
         finally:
+            latency = time.perf_counter() - start
+            if metrics_enabled:
+                app_metrics.request_finished(scope, status_code, latency)
+            if access_logger.enabled:
+                access_logger.log(scope, request_id, status_code, latency, db_stats)
+            elif db_stats.count:
+                logger.info(
+                    f'- "{request.method} {request.url.path}" {status_code} '
+                    f"{latency * 1000:.1f}ms "
+                    f"db={db_stats.count}q/{db_stats.total * 1000:.1f}ms slowest={db_stats.slowest * 1000:.1f}ms"
+                )
+            db_stats_var.reset(db_token)
             request_id_var.reset(token)
 
     @staticmethod
-    async def _get_or_create_request_id(request: Request, key: str, prefix: str = "") -> str:
+    def _get_or_create_request_id(request: Request, key: str, prefix: str = "") -> str:
         request_id = request.headers.get(key)
         if not request_id:
             request_id = f"{prefix}{uuid.uuid4()}"
@@ -104,6 +151,95 @@ class CorsMiddleware(CORSMiddleware):
         )
 
 
+class ErrorLogLimiter:
+    """
+    错误日志限流：按(方法, 路由, 状态码, 异常类型)分组
+    - 每个窗口内前burst次按原样记录（含traceback），之后按sample_rate采样记录单行日志，其余仅计数
+    - 窗口结束后输出汇总：suppressed X similar
+    - 分组数上限max_keys：超出时按最近最少出现淘汰（淘汰时输出其汇总）
+    注：5xx不限流；未匹配路由的请求不按原始路径分组
+    """
+
+    def __init__(
+        self,
+        window: float | None = None,
+        burst: int | None = None,
+        sample_rate: float | None = None,
+        max_keys: int = 10000,
+    ):
+        self._window = window
+        self._burst = burst
+        self._sample_rate = sample_rate
+        self.max_keys = max_keys
+        self._groups: OrderedDict[tuple, list] = OrderedDict()  # key -> [窗口开始时间, 出现次数, 抑制次数]（LRU顺序）
+        self._next_sweep = 0.0
+
+    @property
+    def window(self) -> float:
+        return self._window or g.config.APP_ERROR_LOG_WINDOW
+
+    @property
+    def burst(self) -> int:
+        return self._burst if self._burst is not None else g.config.APP_ERROR_LOG_BURST
+
+    @property
+    def sample_rate(self) -> float:
+        return self._sample_rate if self._sample_rate is not None else g.config.APP_ERROR_LOG_SAMPLE_RATE
+
+    def log(self, request: Request, status_code: int, exc: Exception, lmsg: str, log_traceback: bool = True):
+        if status_code >= 500:
+            self._emit(lmsg, log_traceback)
+            return
+        route = getattr(request.scope.get("route"), "path", None) or _UNMATCHED_ROUTE
+        key = (request.method, route, status_code, type(exc).__name__)
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        group = self._groups.get(key)
+        if group is None:
+            while len(self._groups) >= self.max_keys:
+                self._summary(*self._groups.popitem(last=False))
+            group = self._groups[key] = [now, 0, 0]
+        else:
+            self._groups.move_to_end(key)
+            if now - group[0] >= self.window:
+                self._summary(key, group)
+                group[:] = [now, 0, 0]
+        group[1] += 1
+        if group[1] <= self.burst:
+            self._emit(lmsg, log_traceback)
+        elif random.random() < self.sample_rate:
+            self._emit(f"{lmsg} (sampled)", False)
+        else:
+            group[2] += 1
+
+    def _sweep(self, now: float):
+        # 输出已结束窗口的汇总并清理
+        for key, group in list(self._groups.items()):
+            if now - group[0] >= self.window:
+                self._summary(key, group)
+                del self._groups[key]
+        self._next_sweep = now + self.window
+
+    def _summary(self, key: tuple, group: list):
+        if group[2]:
+            method, route, status_code, exc_name = key
+            logger.warning(
+                f'- "{method} {route}" {status_code} {exc_name}: '
+                f"suppressed {group[2]} similar within {self.window:g}s"
+            )
+
+    @staticmethod
+    def _emit(lmsg: str, log_traceback: bool):
+        if log_traceback:
+            logger.exception(lmsg, stacklevel=3)
+        else:
+            logger.error(lmsg, stacklevel=3)
+
+
+error_log_limiter = ErrorLogLimiter()
+
+
 class ExceptionsHandler:
     @staticmethod
     async def custom_exception_handler(
@@ -113,10 +249,7 @@ class ExceptionsHandler:
         log_request: bool = False,
     ) -> JSONResponse:
         lmsg = f'- "{request.method} {request.url.path}" {exc.code} {exc.msg}'
-        if log_traceback:
-            logger.exception(lmsg)
-        else:
-            logger.error(lmsg)
+        error_log_limiter.log(request, exc.status.status_code, exc, lmsg, log_traceback=log_traceback)
         if log_request:
             logger.warning(f"Query params: {request.query_params or '<Empty>'}")
             logger.warning(f"Body: {await request.body() or b'<Empty>'!r}")
@@ -147,10 +280,7 @@ class ExceptionsHandler:
             error = exc.errors()[0]
             msg = f"{error['loc'][-1]} ({error['type']}) {error['msg'].replace('Value error, ', '').lower()}"
         lmsg = f'- "{request.method} {request.url.path}" {Status.VALIDATION_ERROR.code} {msg}'
-        if log_traceback:
-            logger.exception(lmsg)
-        else:
-            logger.error(lmsg)
+        error_log_limiter.log(request, Status.VALIDATION_ERROR.status_code, exc, lmsg, log_traceback=log_traceback)
         if log_request:
             logger.warning(f"Query params: {request.query_params or '<Empty>'}")
             logger.warning(f"Body: {await request.body() or b'<Empty>'!r}")
@@ -168,10 +298,7 @@ class ExceptionsHandler:
         log_request: bool = False,
     ) -> JSONResponse:
         lmsg = f'- "{request.method} {request.url.path}" {exc.status_code} {exc.detail}'
-        if log_traceback:
-            logger.exception(lmsg)
-        else:
-            logger.error(lmsg)
+        error_log_limiter.log(request, exc.status_code, exc, lmsg, log_traceback=log_traceback)
         if log_request:
             logger.warning(f"Query params: {request.query_params or '<Empty>'}")
             logger.warning(f"Body: {await request.body() or b'<Empty>'!r}")
@@ -1,6 +1,10 @@
-from collections.abc import Mapping
+import json
+from collections.abc import Callable, Mapping
+from decimal import Decimal
+from typing import Any
 
-from fastapi.encoders import jsonable_encoder
+from fastapi.encoders import decimal_encoder, jsonable_encoder
+from pydantic import BaseModel
 from starlette.background import BackgroundTask
 from starlette.responses import ContentStream, JSONResponse, StreamingResponse
 from toollib.utils import map_jsontype
@@ -8,7 +12,41 @@ from toollib.utils import map_jsontype
 from app.core.context import request_id_var
 from app.core.status import Status
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 _EXPOSE_ERROR = True
+_JSON_DUMPS: Callable[[Any], bytes] | None = None  # 自定义编码器（为空则优先orjson，其次json）
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return decimal_encoder(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)  # 与jsonable_encoder一致
+    return jsonable_encoder(obj)
+
+
+class EnvelopeResponse(JSONResponse):
+    """
+    统一响应（直接序列化datetime/Decimal/UUID/BaseModel等，无需jsonable_encoder预处理）
+    """
+
+    def render(self, content: Any) -> bytes:
+        if _JSON_DUMPS is not None:
+            return _JSON_DUMPS(content)
+        if orjson is not None:
+            return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+            default=_json_default,
+        ).encode("utf-8")
 
 
 class Responses:
@@ -27,10 +65,10 @@ class Responses:
         content = {
             "msg": msg or status.msg,
             "code": code or status.code,
-            "data": jsonable_encoder(data) if encode_data else data,
+            "data": jsonable_encoder(data) if encode_data else data,  # 一般无需encode_data，由EnvelopeResponse直接序列化
             "request_id": request_id_var.get(),
         }
-        return JSONResponse(
+        return EnvelopeResponse(
             content=content,
             status_code=status_code or status.status_code,
             headers=headers,
@@ -54,12 +92,12 @@ class Responses:
         content = {
             "msg": msg or status.msg,
             "code": code or status.code,
-            "data": jsonable_encoder(data) if encode_data else data,
+            "data": jsonable_encoder(data) if encode_data else data,  # 一般无需encode_data，由EnvelopeResponse直接序列化
             "request_id": request_id_var.get(),
         }
         if _EXPOSE_ERROR:
             content["error"] = str(error) if error else None
-        return JSONResponse(
+        return EnvelopeResponse(
             content=content,
             status_code=status_code or status.status_code,
             headers=headers,
@@ -13,6 +13,7 @@ class Status(Enum):
     NOT_FOUND_ERROR = (404, "资源未找到", 404)
     VALIDATION_ERROR = (422, "数据校验失败", 422)
     INTERNAL_SERVER_ERROR = (500, "服务开小差了，请稍后再试", 500)
+    SERVICE_BUSY_ERROR = (503, "服务繁忙，请稍后再试", 503)
 
     # =========== 业务错误（10000 开始） ===========
     # 【通用业务】10xxx
@@ -44,6 +45,7 @@ class Status(Enum):
             404: cls.NOT_FOUND_ERROR,
             422: cls.VALIDATION_ERROR,
             500: cls.INTERNAL_SERVER_ERROR,
+            503: cls.SERVICE_BUSY_ERROR,
         }
         return mapping.get(status_code, cls.FAILURE)
 
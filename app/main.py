@@ -13,6 +13,12 @@ from fastapi import FastAPI
 
 from app import api
 from app.core import g, middleware
+from app.core._log import close_log_queue
+from app.core.access_log import access_logger
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import app_metrics
+from app.utils.password_util import password_hasher
+from app.utils.write_util import close_write_behind
 
 g.setup()
 openapi_url, docs_url, redoc_url = "/openapi.json", "/docs", "/redoc"
@@ -27,9 +33,21 @@ async def lifespan(xapp: FastAPI):
     g.logger.info(f"Application title '{g.config.APP_TITLE}'")
     g.logger.info(f"Application version '{g.config.APP_VERSION}'")
     # #
+    if loop_monitor.enabled:
+        loop_monitor.start()
     g.logger.info("Application server running")
     yield
+    await loop_monitor.close()
+    await close_write_behind()
+    await access_logger.close()
+    if aredis := getattr(g, "aredis", None):
+        await aredis.aclose(close_connection_pool=True)
+    if snow_cli := getattr(g, "snow_cli", None):
+        snow_cli.close()
+    password_hasher.shutdown()
+    app_metrics.close()
     g.logger.info("Application server shutdown")
+    close_log_queue()
 
 
 app = FastAPI(
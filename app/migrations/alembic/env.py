@@ -6,6 +6,7 @@ from sqlalchemy import engine_from_config, pool
 
 from app.core import g
 from app.core._db import import_tables, make_db_url
+from app.utils.search_util import is_search_object
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -22,6 +23,12 @@ if not decl_base:
     raise RuntimeError("Failed to import DeclBase. Make sure your models are correctly defined and accessible.")
 target_metadata = decl_base.metadata  # type: ignore
 
+
+def include_name(name, type_, parent_names):
+    # 搜索索引（fts表、trgm/fulltext索引）不在metadata中，由`create_search_index`维护
+    return not is_search_object(name)
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -64,6 +71,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         render_as_batch=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -90,6 +98,7 @@ def run_migrations_online() -> None:
             compare_type=True,
             compare_server_default=True,
             render_as_batch=True,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
@@ -5,6 +5,16 @@
 from sqlalchemy.orm import DeclarativeBase
 from toollib.sqlacrud import CRUDMixin
 
+from app.utils.search_util import register_search
+
 
 class DeclBase(DeclarativeBase, CRUDMixin):
     """数据模型基类，集成 CRUD 操作"""
+
+    # 可搜索列（子串搜索走索引，查询用`search_contains`，详见`app.utils.search_util`）
+    __searchable__: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.__searchable__ and "__table__" in cls.__dict__:
+            register_search(cls)
@@ -13,8 +13,9 @@ class User(DeclBase):
     __tablename__ = "users"
     __table_args__ = (
         Index("idx_users_nickname", "nickname"),
-        Index("idx_users_created_at", "created_at"),
+        Index("idx_users_created_at_id", "created_at", "id"),
     )
+    __searchable__ = ("phone", "nickname")
 
     id = mapped_column(BigInteger, primary_key=True, default=gen_snow_id, nullable=False, comment="主键")
     phone = mapped_column(String(11), unique=True, index=True, nullable=False, comment="手机号")
@@ -37,6 +38,7 @@ class User(DeclBase):
 class UserList(BaseModel):
     page: int = Field(1, ge=1)
     size: int = Field(10, ge=1, le=200)
+    cursor: str | None = Field(None, max_length=200)  # 游标分页（优先于page，取自上一页的next_cursor）
     phone: str | None = Field(None, min_length=1, max_length=11)
     nickname: str | None = Field(None, min_length=1, max_length=50)
 
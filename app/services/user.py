@@ -1,11 +1,18 @@
-from functools import lru_cache
+from functools import lru_cache, partial
 
 from app.core import g
+from app.core.cache import cached, invalidate_tags
+from app.core._db import commit_session, db_session
 from app.core.exceptions import CustomException
 from app.core.status import Status
 from app.models.user import User
 from app.utils import jwt_util
+from app.utils.cache_util import jwt_key_cache
 from app.utils.ext_util import now_timestamp
+from app.utils.page_util import CountMode, count_total, keyset_page, keyset_where
+from app.utils.password_util import password_hasher
+from app.utils.search_util import search_contains
+from app.utils.write_util import insert_returning, update_returning
 
 _ACCESS_TOKEN_EXP_SECONDS = 2 * 60 * 60
 _REFRESH_TOKEN_EXP_SECONDS = 30 * 24 * 60 * 60
@@ -13,13 +20,16 @@ _REFRESH_TOKEN_EXP_SECONDS = 30 * 24 * 60 * 60
 
 class UserSvc:
     @staticmethod
-    async def list_user(req):
+    async def list_user(req, count_mode: CountMode = "exact"):
         where = []
         if req.phone:
-            where.append(User.phone.contains(req.phone))
+            where.append(search_contains(User.phone, req.phone))
         if req.nickname:
-            where.append(User.nickname.contains(req.nickname))
-        async with g.db_async_session() as session:
+            where.append(search_contains(User.nickname, req.nickname))
+        count_where = list(where)
+        if req.cursor:
+            where.append(keyset_where((User.created_at, User.id), req.cursor))
+        async with db_session(g.db_async_session_ro) as session:
             result = await User.fetch_all(
                 session=session,
                 columns=(
@@ -37,39 +47,43 @@ class UserSvc:
                     "updated_at",
                 ),
                 where=where,
-                order_by=User.created_at.desc(),
-                offset=(req.page - 1) * req.size,
-                limit=req.size,
+                order_by=(User.created_at.desc(), User.id.desc()),
+                offset=0 if req.cursor else (req.page - 1) * req.size,
+                limit=req.size + 1,
                 converters={"id": str},
             )
-            total = await User.count(session=session, where=where)
-            return {"items": result, "total": total}
+            result, next_cursor = keyset_page(result, size=req.size, keys=("created_at", "id"))
+            total = await count_total(session, User, where=count_where, mode=count_mode)
+            return {"items": result, "total": total, "next_cursor": next_cursor, "has_more": next_cursor is not None}
 
     @staticmethod
     async def create_user(req):
-        async with g.db_async_session() as session:
-            result = await User.create(
+        async with db_session(g.db_async_session) as session:
+            result = await insert_returning(
                 session=session,
+                model=User,
                 values={
                     "phone": req.phone,
-                    "password": jwt_util.hash_password(req.password),
+                    "password": await password_hasher.hash(req.password),
                     "jwt_key": jwt_util.gen_jwt_key(key=g.config.JWT_KEY),
                     "role": req.role,
                     "nickname": req.nickname,
                     "age": req.age,
                     "gender": req.gender,
                 },
-                on_conflict={"phone": req.phone},
-                flush=True,
+                conflict_keys=("phone",),
+                returning=("id",),
+                converters={"id": str},
             )
             if not result:
                 raise CustomException(status=Status.RECORD_EXISTS_ERROR)
-            await session.commit()
-            return {"id": str(result.data["id"])}  # type: ignore
+            await commit_session(session)
+            return result
 
     @staticmethod
+    @cached(ttl=300, tags=("user:{user_id}",))
     async def get_user(user_id: str):
-        async with g.db_async_session() as session:
+        async with db_session(g.db_async_session_ro) as session:
             result = await User.fetch_one(
                 session=session,
                 where={"id": int(user_id)},
@@ -95,19 +109,23 @@ class UserSvc:
 
     @staticmethod
     async def delete_user(user_id):
-        async with g.db_async_session() as session:
+        async with db_session(g.db_async_session) as session:
             result = await User.delete(
                 session=session,
                 where={"id": int(user_id)},
             )
             if not result:
                 raise CustomException(status=Status.RECORD_NOT_EXIST_ERROR)
-            await session.commit()
-            return {"id": user_id}
+            await commit_session(
+                session,
+                partial(jwt_key_cache.invalidate, user_id),
+                partial(invalidate_tags, f"user:{user_id}"),
+            )
+        return {"id": user_id}
 
     @staticmethod
     async def update_user(req, user_id: str):
-        async with g.db_async_session() as session:
+        async with db_session(g.db_async_session) as session:
             result = await User.update(
                 session=session,
                 where={"id": int(user_id)},
@@ -115,11 +133,12 @@ class UserSvc:
             )
             if not result:
                 raise CustomException(status=Status.RECORD_NOT_EXIST_ERROR)
-            await session.commit()
-            return {"id": user_id}
+            await commit_session(session, partial(invalidate_tags, f"user:{user_id}"))
+        return {"id": user_id}
 
     @staticmethod
     async def auth_login(req):
+        # 独立会话读取后即归还连接，校验密码（bcrypt，可能排队）期间不占用连接与事务
         async with g.db_async_session() as session:
             result = await User.fetch_one(
                 session=session,
@@ -135,16 +154,30 @@ class UserSvc:
                 ),
                 converters={"id": str},
             )
-            if not result:
-                raise CustomException(status=Status.USER_OR_PASSWORD_ERROR)
-            if result.get("status", 1) != 1:
-                raise CustomException(status=Status.USER_ABNORMAL_ERROR)
-            stored_password = result.pop("password")
-
-        if not jwt_util.verify_password(req.password, stored_password):
+        if not result:
+            raise CustomException(status=Status.USER_OR_PASSWORD_ERROR)
+        if result.get("status", 1) != 1:
+            raise CustomException(status=Status.USER_ABNORMAL_ERROR)
+        stored_password = result.pop("password")
+        if not await password_hasher.verify(req.password, stored_password):
             raise CustomException(status=Status.USER_OR_PASSWORD_ERROR)
 
         new_jwt_key = jwt_util.gen_jwt_key(key=g.config.JWT_KEY)
+        values = {
+            "jwt_key": new_jwt_key,
+            "last_login_at": now_timestamp(),  # 随轮换jwt_key同一次写入（该行已有同步写，不走写后缓冲）
+        }
+        if password_hasher.needs_rehash(stored_password):
+            # 工作因子已变更，登录时透明重新哈希
+            values["password"] = await password_hasher.hash(req.password)
+        async with db_session(g.db_async_session) as session:
+            await User.update(
+                session=session,
+                where={"phone": req.phone},
+                values=values,
+            )
+            await commit_session(session, partial(jwt_key_cache.invalidate, result["id"]))
+
         access_token = jwt_util.gen_jwt(
             payload=result,
             key=new_jwt_key,
@@ -157,17 +190,6 @@ class UserSvc:
             typ="refresh",
             exp_seconds=_REFRESH_TOKEN_EXP_SECONDS,
         )
-        async with g.db_async_session() as session:
-            await User.update(
-                session=session,
-                where={"phone": req.phone},
-                values={
-                    "jwt_key": new_jwt_key,
-                    "last_login_at": now_timestamp(),
-                },
-            )
-            await session.commit()
-
         return {
             "access_token": access_token,
             "token_type": "Bearer",
@@ -180,7 +202,7 @@ class UserSvc:
     @staticmethod
     async def auth_logout(user_id: str):
         new_jwt_key = jwt_util.gen_jwt_key(key=g.config.JWT_KEY)
-        async with g.db_async_session() as session:
+        async with db_session(g.db_async_session) as session:
             result = await User.update(
                 session=session,
                 where={"id": int(user_id)},
@@ -188,16 +210,20 @@ class UserSvc:
             )
             if not result:
                 raise CustomException(status=Status.RECORD_NOT_EXIST_ERROR)
-            await session.commit()
+            await commit_session(session, partial(jwt_key_cache.invalidate, user_id))
         return {"id": user_id}
 
     @staticmethod
     async def auth_refresh(user_id: str):
-        async with g.db_async_session() as session:
-            result = await User.fetch_one(
+        new_jwt_key = jwt_util.gen_jwt_key(key=g.config.JWT_KEY)
+        async with db_session(g.db_async_session) as session:
+            # 轮换jwt_key并取回载荷（仅正常状态）
+            result = await update_returning(
                 session=session,
-                where={"id": int(user_id)},
-                columns=(
+                model=User,
+                where={"id": int(user_id), "status": 1},
+                values={"jwt_key": new_jwt_key},
+                returning=(
                     "id",
                     "phone",
                     "status",
@@ -208,11 +234,10 @@ class UserSvc:
                 converters={"id": str},
             )
             if not result:
-                raise CustomException(status=Status.RECORD_NOT_EXIST_ERROR)
-            if result.get("status", 1) != 1:
-                raise CustomException(status=Status.USER_ABNORMAL_ERROR)
+                exists = await User.fetch_one(session=session, where={"id": int(user_id)}, columns=("id",))
+                raise CustomException(status=Status.USER_ABNORMAL_ERROR if exists else Status.RECORD_NOT_EXIST_ERROR)
+            await commit_session(session, partial(jwt_key_cache.invalidate, user_id))
 
-        new_jwt_key = jwt_util.gen_jwt_key(key=g.config.JWT_KEY)
         access_token = jwt_util.gen_jwt(
             payload=result,
             key=new_jwt_key,
@@ -225,13 +250,6 @@ class UserSvc:
             typ="refresh",
             exp_seconds=_REFRESH_TOKEN_EXP_SECONDS,
         )
-        async with g.db_async_session() as session:
-            await User.update(
-                session=session,
-                where={"id": int(user_id)},
-                values={"jwt_key": new_jwt_key},
-            )
-            await session.commit()
 
         return {
             "access_token": access_token,
@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.core import g
+
+logger = logging.getLogger(__name__)
+_UNKNOWN = object()  # redis版本读取失败
+
+
+class TTLCache:
+    """进程内缓存（TTL过期 + LRU淘汰）"""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 10):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expire_at, value = item
+            if expire_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, ttl: float | None = None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Any):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredCache:
+    """
+    二级缓存（字符串值）：进程内TTLCache -> redis -> loader（如数据库）
+    - 回填带版本校验：invalidate递增版本，加载期间发生失效则不回填（避免并发未命中把旧值写回）
+    - 进程内命中校验版本（verify_local=True，一次redis GET）：其他进程失效后立即生效；
+      verify_local=False则省去该次往返，但其他进程的失效最多滞后local_ttl秒（如吊销的jwt_key仍可用）
+    - 跳过缓存加载（use_cache=False）同一键reload_interval秒内最多一次，其间返回缓存值
+    注：未集成redis时仅使用进程内缓存（多进程间的失效滞后local_ttl秒）；redis读取失败时信任进程内缓存
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        local_ttl: float = 10,
+        local_maxsize: int = 10000,
+        redis_ttl: int = 3600,
+        reload_interval: float = 5,
+        verify_local: bool = True,
+    ):
+        self.prefix = prefix
+        self.local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)  # key -> (值, 版本)
+        self.redis_ttl = redis_ttl
+        self.verify_local = verify_local
+        self._reloaded = TTLCache(maxsize=local_maxsize, ttl=reload_interval)  # 最近跳过缓存加载过的键
+        self._epoch = 0  # 本进程失效计数
+
+    async def get(
+        self,
+        key: str,
+        loader: Callable[[str], Awaitable[str | None]],
+        use_cache: bool = True,
+    ) -> str | None:
+        """
+        获取
+        :param key: 键
+        :param loader: 缓存未命中时的加载函数
+        :param use_cache: 是否读缓存（False则直接加载并回填缓存）
+        """
+        if not use_cache:
+            if self._reloaded.get(key):
+                use_cache = True
+            else:
+                self._reloaded.set(key, True)
+        epoch = self._epoch
+        if use_cache:
+            item = self.local.get(key)
+            if item is not None:
+                value, version = item
+                if not self.verify_local or await self._redis_version(key) in (version, _UNKNOWN):
+                    return value
+                self.local.delete(key)  # 已在其他进程失效
+            value, version = await self._redis_get(key)
+            if value is not None:
+                self.local.set(key, (value, version))
+                return value
+        else:
+            version = await self._redis_version(key)
+        value = await loader(key)
+        if value is not None and epoch == self._epoch:
+            self.local.set(key, (value, version))
+            await self._redis_set(key, value, version)
+        return value
+
+    async def invalidate(self, key: str):
+        """失效（本进程+redis；其他进程的进程内缓存经版本校验失效，verify_local=False时在local_ttl内过期）"""
+        self._epoch += 1
+        self.local.delete(key)
+        if aredis := getattr(g, "aredis", None):
+            try:
+                async with aredis.pipe(transaction=True) as pipe:
+                    pipe.delete(self._redis_key(key))
+                    pipe.incr(self._version_key(key))
+                    pipe.expire(self._version_key(key), self.redis_ttl)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"cache invalidate {self.prefix} failed: {e}")
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _version_key(self, key: str) -> str:
+        return f"{self.prefix}:ver:{key}"
+
+    async def _redis_get(self, key: str) -> tuple[str | None, bytes | None]:
+        # (值, 版本)：一次往返
+        if aredis := getattr(g, "aredis", None):
+            try:
+                async with aredis.pipe() as pipe:
+                    pipe.get(self._redis_key(key)).get(self._version_key(key))
+                    value, version = await pipe.execute()
+                return (value.decode("utf-8") if isinstance(value, bytes) else value), version
+            except Exception as e:
+                logger.warning(f"cache get {self.prefix} failed: {e}")
+        return None, None
+
+    async def _redis_version(self, key: str) -> Any:
+        # 版本（未集成redis时None，读取失败时_UNKNOWN）
+        if aredis := getattr(g, "aredis", None):
+            try:
+                return await aredis.get(self._version_key(key))
+            except Exception as e:
+                logger.warning(f"cache get {self.prefix} failed: {e}")
+                return _UNKNOWN
+        return None
+
+    async def _redis_set(self, key: str, value: str, version: bytes | None):
+        # 版本未变（加载期间无失效）才回填
+        if aredis := getattr(g, "aredis", None):
+
+            async def fill(pipe):
+                if await pipe.get(self._version_key(key)) == version:
+                    pipe.multi()
+                    pipe.set(self._redis_key(key), value, ex=self.redis_ttl)
+
+            try:
+                await aredis.transaction(fill, self._version_key(key), retries=1)
+            except Exception as e:
+                logger.warning(f"cache set {self.prefix} failed: {e}")
+
+
+# jwt_key缓存（轮换jwt_key后需调用`await jwt_key_cache.invalidate(user_id)`）
+jwt_key_cache = TieredCache(prefix="cache:user_jwt_key")
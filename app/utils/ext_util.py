@@ -13,5 +13,10 @@ def gen_snow_id(to_str: bool = False):
     return g.snow_cli.gen_uid(to_str=to_str)
 
 
+def gen_snow_ids(n: int, to_str: bool = False) -> list:
+    """批量生成雪花id（批量插入时预先填充主键，避免逐行调用列默认值）"""
+    return g.snow_cli.gen_many(n, to_str=to_str)
+
+
 def now_timestamp() -> int:
     return now2timestamp()  # type: ignore
@@ -1,11 +1,21 @@
 import secrets
+import time
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
-from typing import Literal
+from typing import Any, Literal
 
 import bcrypt
 import jwt
+from jwt.algorithms import get_default_algorithms
+from jwt.utils import base64url_decode
+
+try:
+    import orjson as json
+except ImportError:
+    import json
 
 _JWT_ALGORITHM = "HS256"
+_JWT_ALGORITHMS = get_default_algorithms()
 
 
 def gen_jwt(
@@ -41,14 +51,76 @@ def verify_jwt(
     return payload
 
 
+@dataclass(frozen=True, slots=True)
+class ParsedJWT:
+    """已解析的jwt（仅解析一次，可多次验签）"""
+
+    header: dict[str, Any]
+    payload: dict[str, Any]
+    signing_input: bytes
+    signature: bytes
+
+
+def parse_jwt(token: str | bytes) -> ParsedJWT:
+    """解析jwt（不验签）"""
+    if isinstance(token, str):
+        token = token.encode("utf-8")
+    try:
+        signing_input, crypto_segment = token.rsplit(b".", 1)
+        header_segment, payload_segment = signing_input.split(b".", 1)
+        header = json.loads(base64url_decode(header_segment))
+        payload = json.loads(base64url_decode(payload_segment))
+        signature = base64url_decode(crypto_segment)
+    except Exception as e:
+        raise jwt.DecodeError(f"Invalid token: {e}") from e
+    if not isinstance(header, dict) or not isinstance(payload, dict):
+        raise jwt.DecodeError("Invalid token: header and payload must be json objects")
+    return ParsedJWT(header=header, payload=payload, signing_input=signing_input, signature=signature)
+
+
+def verify_parsed_jwt(
+    parsed: ParsedJWT,
+    key: str,
+    typ: str | None = None,
+    algorithms: tuple = (_JWT_ALGORITHM,),
+    leeway: float = 0,
+) -> dict:
+    """验证已解析的jwt（签名、exp、nbf、typ）"""
+    alg = parsed.header.get("alg")
+    if alg not in algorithms or alg not in _JWT_ALGORITHMS:
+        raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+    alg_obj = _JWT_ALGORITHMS[alg]
+    if not alg_obj.verify(parsed.signing_input, alg_obj.prepare_key(key), parsed.signature):
+        raise jwt.InvalidSignatureError("Signature verification failed")
+    payload = parsed.payload
+    now = time.time()
+    if "exp" in payload:
+        try:
+            exp = int(payload["exp"])
+        except (TypeError, ValueError):
+            raise jwt.DecodeError("Expiration Time claim (exp) must be an integer.") from None
+        if exp <= now - leeway:
+            raise jwt.ExpiredSignatureError("Signature has expired")
+    if "nbf" in payload:
+        try:
+            nbf = int(payload["nbf"])
+        except (TypeError, ValueError):
+            raise jwt.DecodeError("Not Before claim (nbf) must be an integer.") from None
+        if nbf > now + leeway:
+            raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+    if typ is not None and payload.get("typ") != typ:
+        raise ValueError(f"Invalid token type: expected {typ}, got {payload.get('typ')}")
+    return payload
+
+
 def gen_jwt_key(nbytes: int = 32, key: str | None = None):
     if key:
         return key
     return secrets.token_hex(nbytes)
 
 
-def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
+def hash_password(password: str, rounds: int = 12) -> str:
+    salt = bcrypt.gensalt(rounds=rounds)
     hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
     return hashed_password.decode("utf-8")
 
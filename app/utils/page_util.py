@@ -0,0 +1,147 @@
+import base64
+import hashlib
+import logging
+from collections.abc import Sequence
+from typing import Any, Literal
+
+from sqlalchemy import and_, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement, ColumnElement
+
+from app.core.exceptions import CustomException
+from app.core.status import Status
+from app.utils.cache_util import TTLCache
+
+try:
+    import orjson as json
+except ImportError:
+    import json
+
+logger = logging.getLogger(__name__)
+
+# 总数策略：exact-精确，cached-按过滤条件指纹缓存，estimated-数据库执行计划估算，skip-不统计（仅has_more）
+CountMode = Literal["exact", "cached", "estimated", "skip"]
+
+_count_cache = TTLCache(maxsize=10000, ttl=30)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """编码游标（不透明）"""
+    raw = json.dumps(list(values))
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """解码游标"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as e:
+        raise CustomException(status=Status.PARAMS_ERROR, msg="无效的cursor", error=e) from e
+    if not isinstance(values, list) or len(values) != size:
+        raise CustomException(status=Status.PARAMS_ERROR, msg="无效的cursor")
+    return values
+
+
+def keyset_where(columns: Sequence, cursor: str, desc: bool = True) -> ColumnElement:
+    """
+    游标分页条件：(c1, c2, ...) 严格位于游标之后
+    注：columns需与order_by一致且组合唯一（如(created_at, id)），并建立对应的联合索引
+    """
+    values = decode_cursor(cursor, size=len(columns))
+    try:
+        values = [col.type.python_type(v) if v is not None else v for col, v in zip(columns, values, strict=True)]
+    except (TypeError, ValueError, NotImplementedError) as e:
+        raise CustomException(status=Status.PARAMS_ERROR, msg="无效的cursor", error=e) from e
+    conds = []
+    for i, col in enumerate(columns):
+        eqs = [columns[j] == values[j] for j in range(i)]
+        conds.append(and_(*eqs, col < values[i] if desc else col > values[i]))
+    return or_(*conds)
+
+
+def keyset_page(items: list[dict], size: int, keys: Sequence[str]) -> tuple[list[dict], str | None]:
+    """
+    截取一页并生成下一页游标
+    注：查询时limit需为size+1（多取一条用于判断是否有下一页）
+    """
+    if len(items) <= size:
+        return items, None
+    items = items[:size]
+    return items, encode_cursor([items[-1][k] for k in keys])
+
+
+async def count_total(
+    session: AsyncSession,
+    model,
+    where: Sequence[ColumnElement] | None = None,
+    mode: CountMode = "exact",
+    ttl: float = 30,
+) -> int | None:
+    """
+    统计总数（按策略）
+    :param session: 数据库会话
+    :param model: 模型
+    :param where: 过滤条件（不含游标条件）
+    :param mode: 策略
+    :param ttl: cached模式的缓存秒数
+    """
+    where = list(where or [])
+    if mode == "skip":
+        return None
+    if mode == "estimated":
+        try:
+            total = await _estimated_count(session, model, where)
+            if total is not None:
+                return total
+        except Exception as e:
+            logger.warning(f"estimated count {model.__tablename__} failed: {e}")
+        mode = "cached"  # 不支持估算时（如sqlite）退化为cached
+    if mode == "cached":
+        key = _count_fingerprint(session, model, where)
+        total = _count_cache.get(key)
+        if total is None:
+            total = await model.count(session=session, where=where)
+            _count_cache.set(key, total, ttl=ttl)
+        return total
+    return await model.count(session=session, where=where)
+
+
+def _count_fingerprint(session: AsyncSession, model, where: list) -> str:
+    stmt = select(func.count()).select_from(model).where(*where)
+    compiled = stmt.compile(dialect=session.bind.dialect)
+    raw = f"{compiled}|{sorted(compiled.params.items())!r}"
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+async def _estimated_count(session: AsyncSession, model, where: list) -> int | None:
+    dialect = session.bind.dialect
+    stmt = select(literal_column("1")).select_from(model).where(*where)
+    conn = await session.connection()
+    if dialect.name == "postgresql":
+        plan = (await conn.execute(_Explain(stmt, "EXPLAIN (FORMAT JSON)"))).scalar()
+        if isinstance(plan, str | bytes):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    if dialect.name in ("mysql", "mariadb"):
+        row = (await conn.execute(_Explain(stmt, "EXPLAIN"))).mappings().first()
+        return int((row["rows"] or 0) * float(row.get("filtered") or 100) / 100)
+    return None
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN语句（过滤条件按绑定参数传递，不拼接进SQL）"""
+
+    inherit_cache = False
+
+    def __init__(self, stmt, prefix: str = "EXPLAIN"):
+        self.stmt = stmt
+        self.prefix = prefix
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return f"{element.prefix} {compiler.process(element.stmt, **kw)}"
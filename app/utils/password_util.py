@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from app.core import g
+from app.core.exceptions import CustomException
+from app.core.status import Status
+from app.utils import jwt_util
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """
+    密码哈希：bcrypt在独立线程池中执行，避免阻塞事件循环
+    注：并发上限、排队超时、工作因子默认取自配置
+    """
+
+    def __init__(
+        self,
+        rounds: int | None = None,
+        max_workers: int | None = None,
+        queue_timeout: float | None = None,
+    ):
+        self._rounds = rounds
+        self._max_workers = max_workers
+        self._queue_timeout = queue_timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._waiting = 0
+        self._running = 0
+        self._stats = {
+            op: {"count": 0, "timeouts": 0, "wait_total": 0.0, "latency_total": 0.0, "latency_max": 0.0}
+            for op in ("hash", "verify")
+        }
+
+    @property
+    def rounds(self) -> int:
+        return self._rounds or g.config.PASSWORD_BCRYPT_ROUNDS
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers or g.config.PASSWORD_HASH_MAX_WORKERS or min(4, os.cpu_count() or 1)
+
+    @property
+    def queue_timeout(self) -> float:
+        return self._queue_timeout or g.config.PASSWORD_HASH_QUEUE_TIMEOUT
+
+    async def hash(self, password: str) -> str:
+        """哈希"""
+        return await self._run("hash", jwt_util.hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """校验"""
+        return await self._run("verify", jwt_util.verify_password, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """是否需重新哈希（存储的工作因子与配置不一致）"""
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def stats(self) -> dict:
+        """统计（排队数、执行数、各操作耗时ms）"""
+        result: dict[str, Any] = {
+            "queue_depth": self._waiting,
+            "in_flight": self._running,
+            "max_workers": self.max_workers,
+        }
+        for op, s in self._stats.items():
+            count = s["count"] or 1
+            result[op] = {
+                "count": s["count"],
+                "timeouts": s["timeouts"],
+                "wait_avg_ms": round(s["wait_total"] / count * 1000, 3),
+                "latency_avg_ms": round(s["latency_total"] / count * 1000, 3),
+                "latency_max_ms": round(s["latency_max"] * 1000, 3),
+            }
+        return result
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._semaphore = None
+
+    async def _run(self, op: str, func: Callable, *args) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pwdhash")
+        # 本地引用：shutdown会置空，进行中的调用仍释放自己获取的信号量
+        semaphore, executor = self._semaphore, self._executor
+        stats = self._stats[op]
+        self._waiting += 1
+        wait_start = time.perf_counter()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+        except TimeoutError:
+            stats["timeouts"] += 1
+            logger.warning(f"password {op} queue timeout: queue_depth={self._waiting}")
+            raise CustomException(status=Status.SERVICE_BUSY_ERROR) from None
+        finally:
+            self._waiting -= 1
+        start = time.perf_counter()
+        stats["wait_total"] += start - wait_start
+        self._running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        finally:
+            self._running -= 1
+            semaphore.release()
+            latency = time.perf_counter() - start
+            stats["count"] += 1
+            stats["latency_total"] += latency
+            stats["latency_max"] = max(stats["latency_max"], latency)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,222 @@
+import logging
+import re
+
+from sqlalchemy import Boolean, and_, event, literal_column, select, table, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+
+logger = logging.getLogger(__name__)
+
+# 可搜索列：{表名: (列名, ...)}（由模型的`__searchable__`注册）
+_searchable: dict[str, tuple[str, ...]] = {}
+
+# 索引支持的最短搜索词（sqlite-fts5 trigram为3，mysql-ngram默认token为2）
+_MIN_TERM_LEN = {"sqlite": 3, "mysql": 2, "mariadb": 2, "postgresql": 1}
+
+# 搜索相关对象（alembic自动生成迁移时忽略）
+_SEARCH_OBJECT_PAT = re.compile(r"(_fts(_\w+)?$|_trgm$|^ftx_)")
+
+# 前缀范围的上界字符（按mysql列字符集：utf8mb3仅支持BMP）
+_MYSQL_PREFIX_BOUND = {"utf8mb4": "\U0010ffff", "utf8mb3": "\uffff", "utf8": "\uffff"}
+
+
+class SearchContains(ColumnElement):
+    """
+    子串搜索条件（按方言编译为可走索引的形式）
+    - sqlite: FTS5 trigram（外部内容表+触发器同步）
+    - postgresql: pg_trgm GIN索引（LIKE '%x%'）
+    - mysql: ngram FULLTEXT索引（MATCH ... AGAINST）
+    注：未声明为可搜索的列、搜索词短于索引支持长度或其他方言时，退化为LIKE '%x%'（结果一致，不走索引）
+    """
+
+    type = Boolean()
+    inherit_cache = False
+    _is_implicitly_boolean = True  # 直接作为条件（不附加`= 1`）
+
+    def __init__(self, column, term: str):
+        self.column = column
+        self.term = term
+
+
+class SearchPrefix(SearchContains):
+    """前缀搜索条件（范围条件，走B-tree索引）"""
+
+
+def search_contains(column, term: str) -> SearchContains:
+    """子串搜索条件，如：`where.append(search_contains(User.nickname, req.nickname))`"""
+    return SearchContains(column, term)
+
+
+def search_prefix(column, term: str) -> SearchPrefix:
+    """前缀搜索条件（语义不同于子串搜索，需显式选用），如：`where.append(search_prefix(User.phone, req.phone))`"""
+    return SearchPrefix(column, term)
+
+
+def register_search(model):
+    """注册可搜索列（建表时创建对应的搜索索引）"""
+    tbl = model.__table__
+    _searchable[tbl.name] = tuple(model.__searchable__)
+    event.listen(tbl, "after_create", lambda target, connection, **kw: create_search_index(connection, model))
+
+
+def create_search_index(connection, model, rebuild: bool = False):
+    """
+    创建搜索索引（同步连接；迁移中使用：`create_search_index(op.get_bind(), User, rebuild=True)`）
+    :param connection: 数据库连接
+    :param model: 模型（需声明`__searchable__`）
+    :param rebuild: 是否重建（已有数据的表，仅sqlite需要）
+    注：sqlite主键非整数时fts按隐式rowid关联，VACUUM可能重排rowid，VACUUM后需重建（rebuild=True）
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql" and not _ensure_pg_trgm(connection):
+        return
+    for sql in _search_ddl(model.__table__, model.__searchable__, dialect):
+        connection.execute(text(sql))
+    if rebuild and dialect == "sqlite":
+        connection.execute(text(f"INSERT INTO {model.__tablename__}_fts({model.__tablename__}_fts) VALUES('rebuild')"))
+
+
+def drop_search_index(connection, model):
+    """删除搜索索引（同步连接）"""
+    name, columns, dialect = model.__tablename__, model.__searchable__, connection.dialect.name
+    if dialect == "sqlite":
+        stmts = [f"DROP TRIGGER IF EXISTS {name}_fts_{op}" for op in ("ai", "ad", "au")]
+        stmts.append(f"DROP TABLE IF EXISTS {name}_fts")
+    elif dialect == "postgresql":
+        stmts = [f"DROP INDEX IF EXISTS idx_{name}_{col}_trgm" for col in columns]
+    elif dialect in ("mysql", "mariadb"):
+        stmts = [f"ALTER TABLE {name} DROP INDEX ftx_{name}_{col}" for col in columns]
+    else:
+        stmts = []
+    for sql in stmts:
+        connection.execute(text(sql))
+
+
+def is_search_object(name: str | None) -> bool:
+    """是否为搜索相关对象（fts表、trgm/fulltext索引、同步触发器）"""
+    return bool(name and _SEARCH_OBJECT_PAT.search(name))
+
+
+def _ensure_pg_trgm(connection) -> bool:
+    # 创建扩展需相应权限（非超级用户通常没有），失败时跳过trgm索引（搜索退化为不走索引的LIKE）
+    if connection.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+        return True
+    try:
+        with connection.begin_nested():
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except Exception as e:
+        logger.warning(f"pg_trgm extension is missing and cannot be created, skip search index: {e}")
+        return False
+    return True
+
+
+def _fts_rowid(tbl) -> str:
+    # fts关联列：单列整数主键（稳定，VACUUM不变），否则隐式rowid
+    pk = tuple(tbl.primary_key.columns)
+    if len(pk) == 1:
+        try:
+            if issubclass(pk[0].type.python_type, int):
+                return pk[0].name
+        except NotImplementedError:
+            pass
+    return "rowid"
+
+
+def _search_ddl(tbl, columns: tuple[str, ...], dialect: str) -> list[str]:
+    name = tbl.name
+    if dialect == "sqlite":
+        rowid = _fts_rowid(tbl)
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{c}" for c in columns)
+        old_cols = ", ".join(f"old.{c}" for c in columns)
+        insert_new = f"INSERT INTO {name}_fts(rowid, {cols}) VALUES (new.{rowid}, {new_cols});"
+        delete_old = f"INSERT INTO {name}_fts({name}_fts, rowid, {cols}) VALUES ('delete', old.{rowid}, {old_cols});"
+        content_rowid = f", content_rowid='{rowid}'" if rowid != "rowid" else ""
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {name}_fts "
+            f"USING fts5({cols}, content='{name}'{content_rowid}, tokenize='trigram')",
+            f"CREATE TRIGGER IF NOT EXISTS {name}_fts_ai AFTER INSERT ON {name} BEGIN {insert_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS {name}_fts_ad AFTER DELETE ON {name} BEGIN {delete_old} END",
+            f"CREATE TRIGGER IF NOT EXISTS {name}_fts_au AFTER UPDATE OF {cols} ON {name} "
+            f"BEGIN {delete_old} {insert_new} END",
+        ]
+    if dialect == "postgresql":
+        return [
+            f"CREATE INDEX IF NOT EXISTS idx_{name}_{col}_trgm ON {name} USING gin ({col} gin_trgm_ops)"
+            for col in columns
+        ]
+    if dialect in ("mysql", "mariadb"):
+        return [f"ALTER TABLE {name} ADD FULLTEXT INDEX ftx_{name}_{col} ({col}) WITH PARSER ngram" for col in columns]
+    return []
+
+
+def _contains(element: SearchContains) -> ColumnElement:
+    return element.column.contains(element.term, autoescape=True)
+
+
+def _prefix(element: SearchContains, bound: str | None = "\U0010ffff") -> ColumnElement:
+    # 范围条件（而非LIKE 'x%'），各方言均可走B-tree索引；无可用上界时用LIKE 'x%'
+    if bound is None:
+        return element.column.startswith(element.term, autoescape=True)
+    return and_(element.column >= element.term, element.column < element.term + bound)
+
+
+def _mysql_prefix_bound(column, dialect: str) -> str | None:
+    # 上界字符需能以列字符集表示（utf8mb3列与4字节字符比较会报错或无法走索引），字符集未声明时不使用范围
+    charset = getattr(column.type, "charset", None)
+    if not charset and (collation := getattr(column.type, "collation", None)):
+        charset = collation.split("_")[0]
+    if not charset:
+        kwargs = column.table.kwargs
+        charset = kwargs.get(f"{dialect}_charset") or kwargs.get(f"{dialect}_default_charset")
+    return _MYSQL_PREFIX_BOUND.get((charset or "").lower())
+
+
+def _indexed(element: SearchContains, dialect: str) -> bool:
+    col = element.column
+    return col.name in _searchable.get(col.table.name, ()) and len(element.term) >= _MIN_TERM_LEN.get(dialect, 1)
+
+
+@compiles(SearchPrefix)
+def _compile_prefix(element, compiler, **kw):
+    return compiler.process(_prefix(element), **kw)
+
+
+@compiles(SearchPrefix, "mysql")
+@compiles(SearchPrefix, "mariadb")
+def _compile_prefix_mysql(element, compiler, **kw):
+    bound = _mysql_prefix_bound(element.column, compiler.dialect.name)
+    return compiler.process(_prefix(element, bound), **kw)
+
+
+@compiles(SearchContains)
+def _compile_default(element, compiler, **kw):
+    return compiler.process(_contains(element), **kw)
+
+
+@compiles(SearchContains, "sqlite")
+def _compile_sqlite(element, compiler, **kw):
+    if not _indexed(element, "sqlite"):
+        return compiler.process(_contains(element), **kw)
+    tbl, col = element.column.table, element.column.name
+    name = tbl.name
+    phrase = '"' + element.term.replace('"', '""') + '"'
+    rowids = select(literal_column("rowid")).select_from(table(f"{name}_fts"))
+    rowids = rowids.where(literal_column(f"{name}_fts.{col}").op("MATCH")(phrase))
+    return compiler.process(literal_column(f"{name}.{_fts_rowid(tbl)}").in_(rowids), **kw)
+
+
+@compiles(SearchContains, "postgresql")
+def _compile_postgresql(element, compiler, **kw):
+    return compiler.process(_contains(element), **kw)
+
+
+@compiles(SearchContains, "mysql")
+@compiles(SearchContains, "mariadb")
+def _compile_mysql(element, compiler, **kw):
+    if not _indexed(element, compiler.dialect.name):
+        return compiler.process(_contains(element), **kw)
+    phrase = '"' + element.term.replace('"', " ") + '"'
+    # MATCH走ngram索引取候选，LIKE复核保证子串语义
+    cond = and_(element.column.match(phrase), _contains(element))
+    return compiler.process(cond, **kw)
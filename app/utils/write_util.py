@@ -0,0 +1,252 @@
+import asyncio
+import contextvars
+import logging
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core import g
+
+logger = logging.getLogger(__name__)
+
+_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+    "mysql": mysql_insert,
+    "mariadb": mysql_insert,
+}
+
+
+async def insert_returning(
+    session: AsyncSession,
+    model,
+    values: dict[str, Any],
+    conflict_keys: Sequence[str] | None = None,
+    returning: Sequence[str] = ("id",),
+    converters: dict[str, Callable] | None = None,
+) -> dict[str, Any] | None:
+    """
+    插入并返回（单次往返）：INSERT ... ON CONFLICT DO NOTHING RETURNING
+    注：唯一冲突时返回None；不支持RETURNING的数据库（如mysql）按主键回查模拟
+        mysql的冲突处理为ON DUPLICATE KEY UPDATE pk=pk（仅作用于唯一冲突，其他错误照常抛出）
+    :param session: 数据库会话
+    :param model: 模型
+    :param values: 插入值（列默认值照常生效）
+    :param conflict_keys: 唯一冲突列（None则冲突时抛IntegrityError）
+    :param returning: 返回列
+    :param converters: 字段转换器
+    """
+    dialect = session.bind.dialect
+    stmt = _INSERTS.get(dialect.name, insert)(model).values(**values)
+    upsert = False
+    if conflict_keys:
+        if dialect.name in ("mysql", "mariadb"):
+            # 不用INSERT IGNORE（会把截断、非空等错误一并降级为警告）；冲突时主键自赋值，不改数据
+            first_pk = next(iter(model.__table__.primary_key.columns))
+            stmt = stmt.on_duplicate_key_update({first_pk.name: first_pk})
+            upsert = True
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_keys))
+    if dialect.insert_returning and not upsert:  # mariadb的RETURNING在冲突时也返回已有行，同样回查
+        result = await session.execute(stmt.returning(*(getattr(model, c) for c in returning)))
+        return _format(result.mappings().first(), converters)
+    result = await session.execute(stmt)
+    if not result.rowcount:
+        return None
+    pk = dict(zip((c.key for c in model.__table__.primary_key), result.inserted_primary_key, strict=True))
+    # upsert时影响行数不能区分插入与冲突（驱动开启了FOUND_ROWS，冲突也计1），按本次主键回查：
+    # 冲突时应用侧生成的主键不存在、自增主键无新值，均查不到
+    if set(returning) <= pk.keys() and not upsert:
+        return _format({c: pk[c] for c in returning}, converters)
+    return await model.fetch_one(session=session, where=pk, columns=returning, converters=converters)
+
+
+async def update_returning(
+    session: AsyncSession,
+    model,
+    where: dict[str, Any] | Sequence[ColumnElement],
+    values: dict[str, Any],
+    returning: Sequence[str] = ("id",),
+    converters: dict[str, Callable] | None = None,
+) -> dict[str, Any] | None:
+    """
+    更新并返回（单次往返）：UPDATE ... RETURNING
+    注：未匹配时返回None（多行匹配时返回其一）；不支持RETURNING的数据库（如mysql）更新后按where回查模拟
+    :param session: 数据库会话
+    :param model: 模型
+    :param where: 过滤条件（dict为等值条件）
+    :param values: 更新值（onupdate照常生效）
+    :param returning: 返回列
+    :param converters: 字段转换器
+    """
+    if isinstance(where, dict):
+        where = [getattr(model, k) == v for k, v in where.items()]
+    if not where:
+        raise ValueError("'where' is required")
+    stmt = update(model).where(*where).values(**values).execution_options(synchronize_session=False)
+    if session.bind.dialect.update_returning:
+        result = await session.execute(stmt.returning(*(getattr(model, c) for c in returning)))
+        return _format(result.mappings().first(), converters)
+    result = await session.execute(stmt)
+    if not result.rowcount:
+        return None
+    row = (await session.execute(select(*(getattr(model, c) for c in returning)).where(*where).limit(1))).mappings()
+    return _format(row.first(), converters)
+
+
+def _format(row, converters: dict[str, Callable] | None = None) -> dict[str, Any] | None:
+    if row is None:
+        return None
+    data = dict(row)
+    for key, converter in (converters or {}).items():
+        if key in data:
+            data[key] = converter(data[key])
+    return data
+
+
+class WriteBehind:
+    """
+    写后缓冲：非关键热点列（如浏览数、最近活跃时间）的更新按主键合并，按间隔或数量批量刷写（UPDATE ... CASE）
+    - 仅用于同一行没有同步写入的场景：已有同步UPDATE时应并入该语句（否则每次多一次写入）
+    - 缓冲上限max_buffer（默认max_pending*10，刷写失败时缓冲会累积）：超出时丢弃新主键的更新并计入dropped
+    注：缓冲在进程内，异常退出会丢失未刷写的数据；优雅退出时由lifespan调用`close_write_behind()`刷写
+    """
+
+    _instances: list["WriteBehind"] = []
+
+    def __init__(
+        self,
+        model,
+        columns: Sequence[str],
+        interval: float | None = None,
+        max_pending: int | None = None,
+        max_buffer: int | None = None,
+        batch_size: int = 500,
+    ):
+        (self._pk,) = model.__table__.primary_key.columns
+        self.model = model
+        self.columns = tuple(columns)
+        self._interval = interval
+        self._max_pending = max_pending
+        self._max_buffer = max_buffer
+        self.batch_size = batch_size
+        self._pending: dict[Any, dict[str, Any]] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stats = {"added": 0, "flushed": 0, "statements": 0, "errors": 0, "dropped": 0}
+        WriteBehind._instances.append(self)
+
+    @property
+    def interval(self) -> float:
+        return self._interval or g.config.DB_WRITE_BEHIND_INTERVAL
+
+    @property
+    def max_pending(self) -> int:
+        return self._max_pending or g.config.DB_WRITE_BEHIND_MAX_PENDING
+
+    @property
+    def max_buffer(self) -> int:
+        return self._max_buffer or self.max_pending * 10
+
+    def add(self, pk: Any, **values):
+        """加入缓冲（同一主键合并，后写覆盖先写）"""
+        if unknown := values.keys() - set(self.columns):
+            raise ValueError(f"Invalid write-behind columns {sorted(unknown)} for {self.model.__tablename__}")
+        pk = self._pk.type.python_type(pk)
+        if pk not in self._pending and len(self._pending) >= self.max_buffer:
+            self._drop(1)
+            return
+        self._pending.setdefault(pk, {}).update(values)
+        self._stats["added"] += 1
+        self._ensure_task()
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """刷写（返回刷写行数，失败时放回缓冲且不覆盖更新的值）"""
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        flushed = 0
+        for i in range(0, len(items), self.batch_size):
+            batch = dict(items[i : i + self.batch_size])
+            try:
+                async with g.db_async_session() as session:
+                    await session.execute(self._update_stmt(batch))
+                    await session.commit()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"write-behind {self.model.__tablename__} flush failed: {e}")
+                dropped = 0
+                for pk, values in items[i:]:
+                    if pk not in self._pending and len(self._pending) >= self.max_buffer:
+                        dropped += 1
+                        continue
+                    self._pending[pk] = values | self._pending.get(pk, {})
+                if dropped:
+                    self._drop(dropped)
+                break
+            flushed += len(batch)
+            self._stats["statements"] += 1
+        self._stats["flushed"] += flushed
+        return flushed
+
+    async def close(self):
+        """停止定时刷写并刷写剩余"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {"table": self.model.__tablename__, "pending": len(self._pending), **self._stats}
+
+    def _update_stmt(self, batch: dict[Any, dict[str, Any]]):
+        values = {}
+        for col in self.columns:
+            whens = {pk: v[col] for pk, v in batch.items() if col in v}
+            if whens:
+                column = getattr(self.model, col)
+                values[col] = case(whens, value=self._pk, else_=column)
+        return update(self.model).where(self._pk.in_(batch)).values(values).execution_options(synchronize_session=False)
+
+    def _drop(self, n: int):
+        # 每累计丢弃1000条记录一次日志
+        before = self._stats["dropped"]
+        self._stats["dropped"] += n
+        if before // 1000 != self._stats["dropped"] // 1000 or not before:
+            logger.warning(
+                f"write-behind {self.model.__tablename__} buffer full ({self.max_buffer}), "
+                f"dropped {self._stats['dropped']} updates so far"
+            )
+
+    def _ensure_task(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            # 空上下文：首次add所在请求的上下文变量（request_id、工作单元、查询统计等）不带入后台任务
+            self._task = asyncio.get_running_loop().create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending:
+                await self.flush()
+
+
+async def close_write_behind():
+    """刷写全部写后缓冲（lifespan关闭时调用）"""
+    for wb in WriteBehind._instances:
+        await wb.close()
@@ -1,5 +1,6 @@
 import multiprocessing
 import os
+import shutil
 
 # ========================
 # 绑定配置
@@ -27,7 +28,8 @@ max_requests_jitter = 50  # 随机抖动（0~50），避免所有 worker 同时
 # 日志配置（容器友好：输出到 stdout/stderr）
 # ========================
 loglevel = os.getenv("LOG_LEVEL", "info")
-accesslog = "-"  # 访问日志 → stdout
+# 访问日志 → stdout（默认关闭：应用层访问日志见APP_ACCESS_LOG，避免重复）
+accesslog = "-" if os.getenv("SERVER_ACCESS_LOG", "false").lower() == "true" else None
 errorlog = "-"  # 错误日志 → stderr
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(T)s %(D)s'
 
@@ -50,6 +52,50 @@ user = None  # 容器中通常以非 root 启动，由 Dockerfile 控制
 group = None
 tmp_upload_dir = None
 
+# ========================
+# 指标（prometheus多进程：各 worker 写入该目录，/metrics 汇总）
+# ========================
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+# ========================
+# 钩子
+# ========================
+def on_starting(server):
+    # 清理上次运行遗留的指标文件
+    multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def when_ready(server):
+    # preload_app时master已初始化雪花id生成器：释放其节点租约（master不生成id）
+    if snow_cli := _snow_cli():
+        snow_cli.close()
+
+
+def post_fork(server, worker):
+    # 各worker重新租用雪花节点，避免共用master的worker_id
+    if snow_cli := _snow_cli():
+        snow_cli.after_fork()
+
+
+def child_exit(server, worker):
+    # worker退出（含异常退出）：其处理中等gauge不再计入
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def _snow_cli():
+    try:
+        from app.core import g
+    except ImportError:
+        return None
+    return g.__dict__.get("snow_cli")  # 仅已初始化时（preload_app）
+
+
 # ========================
 # 安全加固（可选但推荐）
 # ========================
@@ -332,11 +332,11 @@ class CMD:
             elif k.startswith("single/"):
                 k = k.replace("single/", "")
             elif k == "config/.env":
-                v = re.sub(r"(?:^[ \t]*#[^\n]*\n)*^[ \t]*(JWT_|SNOW_)[^\n]*\n?", "", v, flags=re.MULTILINE)
+                v = re.sub(r"(?:^[ \t]*#[^\n]*\n)*^[ \t]*#?(JWT_|SNOW_|PROMETHEUS_)[^\n]*\n?", "", v, flags=re.MULTILINE)
             elif re.search(r"config/app_(.*).yaml$", k):
                 v = re.sub(r"^\s*# #\s*\n(?:^\s*DB_.*$\n?)+", "", v, flags=re.MULTILINE)
             elif k == "requirements.txt":
-                v = re.sub(r"^(PyJWT==|bcrypt==|SQLAlchemy==|alembic==|aiosqlite==).*$\n?", "", v, flags=re.MULTILINE)
+                v = re.sub(r"^(orjson==|PyJWT==|bcrypt==|SQLAlchemy==|alembic==|aiosqlite==).*$\n?", "", v, flags=re.MULTILINE)
             return k, v
 
     def _new_db_handler(self, k, v):
@@ -345,6 +345,9 @@ class CMD:
                 k
                 in {
                     "app/core/_db.py",
+                    "app/utils/page_util.py",
+                    "app/utils/write_util.py",
+                    "app/utils/search_util.py",
                     "runmigration.py",
                 }
                 or k.startswith("app/migrations/")
@@ -352,15 +355,20 @@ class CMD:
             ):
                 return None, None
             elif k == "app/api/deps.py":
-                v = re.sub(r"^from.*sqlalchemy.*$\n?", "", v, flags=re.MULTILINE)
-                v = re.sub(r"\n\s*# 建议：jwt_key进行redis缓存.*?(?=\n\s*\n|$)", "", v, flags=re.DOTALL)
+                v = re.sub(r"^from.*(sqlalchemy|cache_util|_db).*$\n?", "", v, flags=re.MULTILINE)
+                v = re.sub(r"^from collections.abc import AsyncIterator\n\n", "", v, flags=re.MULTILINE)
+                v = re.sub(r"^# -------------------- db --------------------\n.*?(?=^# ----)", "", v, flags=re.MULTILINE | re.DOTALL)
+                v = re.sub(r"\n\s*# jwt_key缓存.*?(?=\n\s*\n|$)", "", v, flags=re.DOTALL)
+                v = re.sub(r"\n\s*@staticmethod\n\s*async def _load_user_jwt_key\(.*?(?=\n\n\n)", "", v, flags=re.DOTALL)
             elif k == "app/core/__init__.py":
                 v = re.sub(r"^from.*(sqlalchemy|_db).*$\n?", "", v, flags=re.MULTILINE)
-                v = re.sub(r'^\s*(?:#\s*)?"db_async_session",?\s*\n', "", v, flags=re.MULTILINE)
-                v = self._repl_funcs(func_names="db_async_session", v=v)
+                v = re.sub(r'^\s*(?:#\s*)?"db_async_session(_ro)?",?\s*\n', "", v, flags=re.MULTILINE)
+                v = self._repl_funcs(func_names="(db_async_session|db_async_session_ro)", v=v)
             elif k == "app/core/_conf.py":
                 v = re.sub(r"^\s*DB_.*$\n?", "", v, flags=re.MULTILINE)
                 v = re.sub(r"^\s*# #[ \t]*\n(?=\s*\n)", "", v, flags=re.MULTILINE)
+            elif k == "app/main.py":
+                v = re.sub(r"^.*write_behind.*$\n?", "", v, flags=re.MULTILINE)
             elif k == "app/core/status.py":
                 v = re.sub(r"^\s*# 【用户模块】.*$\n?", "", v, flags=re.MULTILINE)
                 v = re.sub(r"^\s*USER_.*$\n?", "", v, flags=re.MULTILINE)
@@ -419,8 +427,8 @@ class CMD:
             k, v = None, None
         elif k == "app/core/__init__.py":
             v = re.sub(r"^\s*from\s+.*?(Redis|_redis).*?$\n?", "", v, flags=re.MULTILINE)
-            v = re.sub(r'^\s*(?:#\s*)?"redis_cli",?\s*\n', "", v, flags=re.MULTILINE)
-            v = self._repl_funcs(func_names="redis_cli", v=v)
+            v = re.sub(r'^\s*(?:#\s*)?"(redis_cli|aredis)",?\s*\n', "", v, flags=re.MULTILINE)
+            v = self._repl_funcs(func_names="(redis_cli|aredis)", v=v)
         elif k == "app/core/_conf.py" or re.search(r"config/app_(.*).yaml$", k):
             v = re.sub(r"^\s*REDIS_.*$\n?", "", v, flags=re.MULTILINE)
         elif k == "app/core.py":
@@ -435,7 +443,7 @@ class CMD:
     def _new_snow_handler(self, k, v):
         if k == "app/api/deps.py":
             v = v.replace('params={"id": int(user_id)}', 'params={"id": user_id}')
-        elif k == "app/core/_snow.py":
+        elif k in ("app/core/_snow.py", "scripts/bench_snow.py"):
             return None, None
         elif k == "app/core/__init__.py":
             v = re.sub(r"^\s*from\s+.*?(Snow|_snow).*?$\n?", "", v, flags=re.MULTILINE)
@@ -451,12 +459,10 @@ class CMD:
             )
         elif k == "app/services/user.py":
             v = re.sub(r'^\s*converters={"id": str},*$\n?', "", v, flags=re.MULTILINE)
-            v = v.replace('str(result.data["id"])', 'result.data["id"]').replace(
-                'where={"id": int(user_id)},', 'where={"id": user_id},'
-            )
+            v = v.replace('"id": int(user_id)', '"id": user_id')
         elif k == "app/utils/ext_util.py":
             v = re.sub(r"^\s*from\s+.*?core.*?$\n?", "", v, flags=re.MULTILINE)
-            v = self._repl_funcs(func_names="gen_snow_id", v=v)
+            v = self._repl_funcs(func_names="(gen_snow_id|gen_snow_ids)", v=v)
         elif k == "app/core.py":
             v = re.sub(r"^\s*from\s+.*?(Snow|_snow).*?$\n?", "", v, flags=re.MULTILINE)
             v = re.sub(r'^\s*(?:#\s*)?"snow_cli",?\s*\n', "", v, flags=re.MULTILINE)
@@ -636,9 +642,7 @@ class CMD:
                 )
             elif "services" in k:
                 v = re.sub(r'^\s*converters={"id": str},*$\n?', "", v, flags=re.MULTILINE)
-                v = v.replace('str(result.data["id"])', 'result.data["id"]').replace(
-                    'where={"id": int(tpl_id)},', 'where={"id": tpl_id},'
-                )
+                v = v.replace('"id": int(tpl_id)', '"id": tpl_id')
         return v
 
     def tpl(self):
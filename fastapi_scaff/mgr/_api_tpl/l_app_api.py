@@ -19,6 +19,8 @@ router = APIRouter()
         data={
             "items": "list",
             "total": "int",
+            "next_cursor": "str",
+            "has_more": "bool",
         }
     ),
 )
@@ -6,6 +6,7 @@ from pydantic import BaseModel, Field
 class TplList(BaseModel):
     page: int = Field(1, ge=1)
     size: int = Field(10, ge=1, le=200)
+    cursor: str | None = Field(None, max_length=200)  # 游标分页（优先于page，取自上一页的next_cursor）
 
 
 class TplSvc:
@@ -14,7 +15,8 @@ class TplSvc:
         # TODO: 业务逻辑
         result = []
         total = 0
-        return {"items": result, "total": total}
+        next_cursor = None
+        return {"items": result, "total": total, "next_cursor": next_cursor, "has_more": next_cursor is not None}
 
 
 @lru_cache(maxsize=1)
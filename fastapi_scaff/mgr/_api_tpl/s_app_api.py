@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, Query
 
-from app.api.deps import JWTUser, get_current_user
+from app.api.deps import JWTUser, get_current_user, get_db_uow
 from app.core.responses import Responses, response_docs
 from app.models.tpl import (
     TplCreate,
@@ -11,7 +11,7 @@ from app.services.tpl import TplSvc, get_tpl_svc
 
 # -------------------- 请根据自身需求修改 --------------------
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_db_uow, scope="function")])  # 请求级工作单元
 
 
 @router.get(
@@ -28,6 +28,8 @@ router = APIRouter()
                 }
             ],
             "total": "int",
+            "next_cursor": "str",
+            "has_more": "bool",
         }
     ),
 )
@@ -36,7 +38,7 @@ async def list_tpl(
     tpl_svc: TplSvc = Depends(get_tpl_svc),
     current_user: JWTUser = Depends(get_current_user),
 ):
-    data = await tpl_svc.list_tpl(req)
+    data = await tpl_svc.list_tpl(req, count_mode="exact")  # 总数策略：exact|cached|estimated|skip
     return Responses.success(data=data)
 
 
@@ -25,6 +25,8 @@ router = APIRouter()
                 }
             ],
             "total": "int",
+            "next_cursor": "str",
+            "has_more": "bool",
         }
     ),
 )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from sqlalchemy import BigInteger, String
+from sqlalchemy import BigInteger, Index, String
 from sqlalchemy.orm import mapped_column
 
 from app.models import DeclBase
@@ -8,6 +8,8 @@ from app.utils.ext_util import gen_snow_id, now_timestamp
 
 class Tpl(DeclBase):
     __tablename__ = "tpls"
+    __table_args__ = (Index("idx_tpls_created_at_id", "created_at", "id"),)
+    __searchable__ = ("name",)  # 可搜索列（子串搜索走索引，不需要则删除）
 
     id = mapped_column(BigInteger, primary_key=True, default=gen_snow_id, nullable=False, comment="主键")
     name = mapped_column(String(50), unique=True, index=True, nullable=False, comment="名称")
@@ -21,6 +23,7 @@ class Tpl(DeclBase):
 class TplList(BaseModel):
     page: int = Field(1, ge=1)
     size: int = Field(10, ge=1, le=200)
+    cursor: str | None = Field(None, max_length=200)  # 游标分页（优先于page，取自上一页的next_cursor）
     name: str | None = Field(None, min_length=1, max_length=50)
 
 
@@ -8,3 +8,4 @@ class Tpl:
 class TplList(BaseModel):
     page: int = Field(1, ge=1)
     size: int = Field(10, ge=1, le=200)
+    cursor: str | None = Field(None, max_length=200)  # 游标分页（优先于page，取自上一页的next_cursor）
@@ -1,20 +1,28 @@
-from functools import lru_cache
+from functools import lru_cache, partial
 
 from sqlalchemy.exc import IntegrityError
 
 from app.core import g
+from app.core.cache import cached, invalidate_tags
+from app.core._db import commit_session, db_session
 from app.core.exceptions import CustomException
 from app.core.status import Status
 from app.models.tpl import Tpl
+from app.utils.page_util import CountMode, count_total, keyset_page, keyset_where
+from app.utils.search_util import search_contains
+from app.utils.write_util import insert_returning
 
 
 class TplSvc:
     @staticmethod
-    async def list_tpl(req):
+    async def list_tpl(req, count_mode: CountMode = "exact"):
         where = []
         if req.name:
-            where.append(Tpl.name.contains(req.name))
-        async with g.db_async_session() as session:
+            where.append(search_contains(Tpl.name, req.name))
+        count_where = list(where)
+        if req.cursor:
+            where.append(keyset_where((Tpl.created_at, Tpl.id), req.cursor))
+        async with db_session(g.db_async_session_ro) as session:
             result = await Tpl.fetch_all(
                 session=session,
                 columns=(
@@ -24,33 +32,37 @@ class TplSvc:
                     "updated_at",
                 ),
                 where=where,
-                order_by=Tpl.created_at.desc(),
-                offset=(req.page - 1) * req.size,
-                limit=req.size,
+                order_by=(Tpl.created_at.desc(), Tpl.id.desc()),
+                offset=0 if req.cursor else (req.page - 1) * req.size,
+                limit=req.size + 1,
                 converters={"id": str},
             )
-            total = await Tpl.count(session=session, where=where)
-            return {"items": result, "total": total}
+            result, next_cursor = keyset_page(result, size=req.size, keys=("created_at", "id"))
+            total = await count_total(session, Tpl, where=count_where, mode=count_mode)
+            return {"items": result, "total": total, "next_cursor": next_cursor, "has_more": next_cursor is not None}
 
     @staticmethod
     async def create_tpl(req):
-        async with g.db_async_session() as session:
-            result = await Tpl.create(
+        async with db_session(g.db_async_session) as session:
+            result = await insert_returning(
                 session=session,
+                model=Tpl,
                 values={
                     "name": req.name,
                 },
-                on_conflict={"name": req.name},
-                flush=True,
+                conflict_keys=("name",),
+                returning=("id",),
+                converters={"id": str},
             )
             if not result:
                 raise CustomException(status=Status.RECORD_EXISTS_ERROR)
-            await session.commit()
-            return {"id": str(result.data["id"])}  # type: ignore
+            await commit_session(session)
+            return result
 
     @staticmethod
+    @cached(ttl=300, tags=("tpl:{tpl_id}",))  # 结果缓存（不需要则删除，同时删除invalidate_tags）
     async def get_tpl(tpl_id):
-        async with g.db_async_session() as session:
+        async with db_session(g.db_async_session_ro) as session:
             result = await Tpl.fetch_one(
                 session=session,
                 where={"id": int(tpl_id)},
@@ -68,19 +80,19 @@ class TplSvc:
 
     @staticmethod
     async def delete_tpl(tpl_id):
-        async with g.db_async_session() as session:
+        async with db_session(g.db_async_session) as session:
             result = await Tpl.delete(
                 session=session,
                 where={"id": int(tpl_id)},
             )
             if not result:
                 raise CustomException(status=Status.RECORD_NOT_EXIST_ERROR)
-            await session.commit()
-            return {"id": tpl_id}
+            await commit_session(session, partial(invalidate_tags, f"tpl:{tpl_id}"))
+        return {"id": tpl_id}
 
     @staticmethod
     async def update_tpl(req, tpl_id: str):
-        async with g.db_async_session() as session:
+        async with db_session(g.db_async_session) as session:
             try:
                 result = await Tpl.update(
                     session=session,
@@ -89,10 +101,10 @@ class TplSvc:
                 )
                 if not result:
                     raise CustomException(status=Status.RECORD_NOT_EXIST_ERROR)
-                await session.commit()
+                await commit_session(session, partial(invalidate_tags, f"tpl:{tpl_id}"))
             except IntegrityError as e:
                 raise CustomException(status=Status.RECORD_EXISTS_ERROR) from e
-            return {"id": tpl_id}
+        return {"id": tpl_id}
 
 
 @lru_cache(maxsize=1)
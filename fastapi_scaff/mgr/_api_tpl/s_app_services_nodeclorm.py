@@ -7,7 +7,8 @@ class TplSvc:
         # TODO: 业务逻辑
         result = []
         total = 0
-        return {"items": result, "total": total}
+        next_cursor = None
+        return {"items": result, "total": total, "next_cursor": next_cursor, "has_more": next_cursor is not None}
 
 
 @lru_cache(maxsize=1)
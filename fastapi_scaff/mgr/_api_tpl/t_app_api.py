@@ -11,6 +11,7 @@ router = APIRouter()
 class TplList(BaseModel):
     page: int = Field(1, ge=1)
     size: int = Field(10, ge=1, le=200)
+    cursor: str | None = Field(None, max_length=200)  # 游标分页（优先于page，取自上一页的next_cursor）
 
 
 @router.get(
@@ -24,6 +25,8 @@ class TplList(BaseModel):
                 }
             ],
             "total": "int",
+            "next_cursor": "str",
+            "has_more": "bool",
         }
     ),
 )
@@ -35,5 +38,7 @@ async def list_tpl(
     data = {
         "items": [],
         "total": 0,
+        "next_cursor": None,
+        "has_more": False,
     }
     return Responses.success(data=data)
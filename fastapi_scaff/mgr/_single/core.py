@@ -31,6 +31,7 @@ class Config(ConfModel):
     APP_LOG_SERIALIZE: bool = False
     APP_LOG_OUTDIR: str = "./logs"
     APP_DISABLE_DOCS: bool = False
+    APP_METRICS: bool = True
     APP_ALLOW_CREDENTIALS: bool = True
     APP_ALLOW_ORIGINS: list = ["*"]
     APP_ALLOW_METHODS: list = ["*"]
@@ -1,13 +1,16 @@
+import time
 import uuid
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
 from starlette.exceptions import HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from toollib.logu import init_logger
 
 from app.api import router
@@ -28,6 +31,14 @@ logger = init_logger(
 )
 # logger.add 可添加其他 handler
 # #
+# 指标（单进程；多进程汇总见标准模板的app/core/metrics.py）
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP请求数", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP请求耗时",
+    ("method", "route"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
 openapi_url, docs_url, redoc_url = "/openapi.json", "/docs", "/redoc"
 if config.APP_DISABLE_DOCS is True:
     openapi_url, docs_url, redoc_url = None, None, None
@@ -45,33 +56,59 @@ async def lifespan(xapp: FastAPI):
     logger.info("Application server shutdown")
 
 
-class HttpMiddleware(BaseHTTPMiddleware):
+class HttpMiddleware:
+    """
+    HTTP中间件（纯ASGI实现，流式响应直接透传）
+    """
+
     _HEADERS = {
         # 可添加相关头
     }
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
-        request_id = await self._get_or_create_request_id(request)
+    def __init__(self, xapp: ASGIApp):
+        self.app = xapp
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope, receive=receive)
+        request_id = self._get_or_create_request_id(request)
         request.state.request_id = request_id
         token = request_id_var.set(request_id)
+        response_started = False
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started, status_code
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                for key, value in self._HEADERS.items():
+                    if key not in headers:
+                        headers[key] = value
+            await send(message)
+
         try:
-            response = await call_next(request)
-            response.headers["X-Request-ID"] = request_id
-            for key, value in self._HEADERS.items():
-                if key not in response.headers:
-                    response.headers[key] = value
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
-            return await self.handle_exception(request, exc)
+            if response_started:  # 响应已开始发送，无法再返回错误响应
+                raise
+            response = await self.handle_exception(request, exc)
+            await response(scope, receive, send_wrapper)
         finally:
+            if config.APP_METRICS:
+                # 按路由模板计（未匹配的路由归为一类，避免按原始路径产生过多标签）
+                route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+                HTTP_REQUESTS.labels(scope["method"], route, str(status_code)).inc()
+                HTTP_REQUEST_DURATION.labels(scope["method"], route).observe(time.perf_counter() - start)
             request_id_var.reset(token)
 
     @staticmethod
-    async def _get_or_create_request_id(request: Request, prefix: str = "req-") -> str:
+    def _get_or_create_request_id(request: Request, prefix: str = "req-") -> str:
         request_id = request.headers.get("X-Request-ID")
         if not request_id:
             request_id = f"{prefix}{uuid.uuid4().hex}"
@@ -106,6 +143,11 @@ class HttpMiddleware(BaseHTTPMiddleware):
         )
 
 
+async def metrics(request: Request) -> Response:
+    """指标接口（供prometheus抓取，对外暴露时请在网关层限制访问）"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 class CorsMiddleware(CORSMiddleware):
     def __init__(self, xapp, **kwargs):
         super().__init__(
@@ -201,3 +243,5 @@ app.add_middleware(CorsMiddleware)
 app.add_exception_handler(RequestValidationError, ExceptionsHandler.request_validation_handler)
 app.add_exception_handler(HTTPException, ExceptionsHandler.http_exception_handler)
 app.include_router(router)
+if config.APP_METRICS:
+    app.add_route("/metrics", metrics, include_in_schema=False)
@@ -69,6 +69,7 @@ job "fastapi-scaff" {
 
       env {
         APP_ENV = "prod"
+        PROMETHEUS_MULTIPROC_DIR = "/tmp/prometheus_multiproc"
       }
 
       config {
@@ -85,6 +86,7 @@ job "fastapi-scaff" {
           "--port", "${local.app_port}",
           "--workers", "${local.app_workers}",
           "--log-level", "info",
+          "--no-access-log",
         ]
 
         mount {
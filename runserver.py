@@ -20,6 +20,7 @@ def run_by_unicorn(
     workers: int,
     log_level: str,
     reload: bool,
+    access_log: bool = False,
 ):
     log_config = {
         "version": 1,
@@ -53,6 +54,7 @@ def run_by_unicorn(
         log_level=log_level,
         log_config=log_config,
         reload=reload,
+        access_log=access_log,  # 应用层访问日志（APP_ACCESS_LOG）已开启时无需服务器访问日志
     )
 
 
@@ -62,6 +64,7 @@ def run_by_gunicorn(
     workers: int,
     log_level: str,
     reload: bool,
+    access_log: bool = False,
 ):
     cmd = [
         "gunicorn",
@@ -74,11 +77,11 @@ def run_by_gunicorn(
         workers,
         "--log-level",
         log_level,
-        "--access-logfile",
-        "-",
         "--error-logfile",
         "-",
     ]
+    if access_log:
+        cmd.extend(["--access-logfile", "-"])
     if reload:
         cmd.append("--reload")
     subprocess.run(cmd, check=True)
@@ -91,6 +94,7 @@ def main(
     log_level: str,
     reload: bool,
     gunicorn: bool,
+    access_log: bool,
 ):
     parser = argparse.ArgumentParser(description="App启动器")
     parser.add_argument("--host", type=str, metavar="", help="host")
@@ -99,6 +103,7 @@ def main(
     parser.add_argument("--log-level", type=str, metavar="", help="日志等级")
     parser.add_argument("--reload", action="store_true", help="是否reload")
     parser.add_argument("--gunicorn", action="store_true", help="是否gunicorn")
+    parser.add_argument("--access-log", action="store_true", help="是否开启服务器访问日志")
     args = parser.parse_args()
     kwargs = {
         "host": args.host or host,
@@ -106,6 +111,7 @@ def main(
         "workers": args.workers or workers,
         "log_level": args.log_level or log_level,
         "reload": args.reload or reload,
+        "access_log": args.access_log or access_log,
     }
     if (args.gunicorn or gunicorn) and not sys.platform.lower().startswith("win"):
         try:
@@ -135,4 +141,5 @@ if __name__ == "__main__":
         log_level="debug",
         reload=False,  # For development environment
         gunicorn=False,  # Not supported on Windows
+        access_log=False,  # 应用层访问日志见APP_ACCESS_LOG
     )
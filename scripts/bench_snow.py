@@ -0,0 +1,99 @@
+"""
+@abstract bench_snow（雪花id生成基准：SnowFlakeGenerator vs toollib.guid.SnowFlake）
+@description
+    python scripts/bench_snow.py [-n 100000] [--threads 8]
+    - 校验：位布局与toollib一致、单线程/多线程唯一且递增
+    - 基准：单个生成（gen_uid）、批量生成（gen_many）、多线程并发生成的吞吐（ids/s，取多次最优）
+    注：toollib的SnowFlake未加锁，多线程下可能报时钟回拨或生成重复id（计入errors/duplicates）
+"""
+
+import argparse
+import sys
+import threading
+import time
+import timeit
+from pathlib import Path
+
+from toollib.guid import SnowFlake
+
+work_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(work_dir))
+
+from app.core._snow import SnowFlakeGenerator  # noqa: E402
+
+
+def check(n: int, threads: int):
+    old, new = SnowFlake(worker_id=3, datacenter_id=7), SnowFlakeGenerator(worker_id=3, datacenter_id=7)
+    a, b = old.gen_uid(), new.gen_uid()
+    assert abs((a >> 22) - (b >> 22)) <= 1 and (a >> 12) & 0x3FF == (b >> 12) & 0x3FF, "layout mismatch"
+    uids = new.gen_many(n)
+    assert len(set(uids)) == n and uids == sorted(uids), "gen_many not unique/increasing"
+    out = []
+
+    def worker():
+        out.extend([new.gen_uid() for _ in range(n // threads)] + new.gen_many(n // threads))
+
+    ts = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert len(set(out)) == len(out), "duplicate ids across threads"
+    print(f"check ok: layout, uniqueness ({n} single-thread, {len(out)} across {threads} threads)")
+
+
+def rate(fn, count: int, repeat: int = 5) -> float:
+    return count / min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def threaded(gen_one, n: int, threads: int) -> tuple[float, int, int]:
+    # (吞吐, 异常数, 重复数)
+    per = n // threads
+    uids, errors = [], [0]
+
+    def worker():
+        out = []
+        for _ in range(per):
+            try:
+                out.append(gen_one())
+            except Exception:
+                errors[0] += 1
+        uids.extend(out)
+
+    ts = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return per * threads / elapsed, errors[0], len(uids) - len(set(uids))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark snowflake id generation.")
+    parser.add_argument("-n", type=int, default=100_000, help="Ids per round (default: 100000)")
+    parser.add_argument("--threads", type=int, default=8, help="Threads for the concurrent round (default: 8)")
+    args = parser.parse_args()
+    n, threads = args.n, args.threads
+
+    check(n, threads)
+    old, new = SnowFlake(), SnowFlakeGenerator()
+    rows = [
+        ("toollib SnowFlake.gen_uid", rate(lambda: [old.gen_uid() for _ in range(n)], n)),
+        ("SnowFlakeGenerator.gen_uid", rate(lambda: [new.gen_uid() for _ in range(n)], n)),
+    ]
+    for size in (100, 1000, 10000):
+        rounds = max(1, n // size)
+        value = rate(lambda: [new.gen_many(size) for _ in range(rounds)], rounds * size)
+        rows.append((f"SnowFlakeGenerator.gen_many({size})", value))
+    base = rows[0][1]
+    for name, value in rows:
+        print(f"{name:<42} {value / 1e6:7.2f}M ids/s  ({value / base:5.1f}x)")
+    for name, gen in (("toollib SnowFlake.gen_uid", old.gen_uid), ("SnowFlakeGenerator.gen_uid", new.gen_uid)):
+        value, errors, dups = threaded(gen, n, threads)
+        print(f"{name + f' x{threads} threads':<42} {value / 1e6:7.2f}M ids/s  errors={errors} duplicates={dups}")
+
+
+if __name__ == "__main__":
+    main()